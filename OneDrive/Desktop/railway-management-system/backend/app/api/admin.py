@@ -1,16 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from app.core.database import get_db
+from sqlalchemy import func, and_, or_, select
+import orjson
+from app.core.database import get_db, SessionLocal
 from app.models import SystemAlert, Train, Booking, TrainSchedule, AlertType, User
-from app.api.auth import get_admin_user
+from app.api.auth import get_admin_user, invalidate_user_cache
 from datetime import datetime, timedelta
-from typing import List
 from app.services import RefundService
-from app.schemas import RefundRequest, RefundRequestUpdate
+from app.schemas import RefundRequest, RefundRequestUpdate, User as UserSchema
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
+USER_STREAM_BATCH_SIZE = 200
+REFUND_STREAM_BATCH_SIZE = 200
+
+def stream_json_array(load, schema) -> StreamingResponse:
+    """Stream the yield_per result of load(db) as a JSON array, serializing one batch of rows at a time
+
+    The body is sent after the handler returns, so the generator opens its own
+    session instead of reading from the request's get_db session.
+    """
+    def generate():
+        with SessionLocal() as db:
+            separator = b""
+            yield b"["
+            for rows in load(db).partitions():
+                yield separator + b",".join(
+                    orjson.dumps(schema.model_validate(row).model_dump(mode="json")) for row in rows
+                )
+                separator = b","
+            yield b"]"
+    
+    return StreamingResponse(generate(), media_type="application/json")
+
 @router.get("/system-alerts")
 def get_system_alerts(
     db: Session = Depends(get_db),
@@ -24,6 +47,7 @@ def get_system_alerts(
     
     # Combine and return
     all_alerts = []
+    now = datetime.utcnow()
     
     # Add existing alerts
     for alert in alerts:
@@ -33,7 +57,7 @@ def get_system_alerts(
             "icon": alert.icon,
             "title": alert.title,
             "message": alert.message,
-            "time": format_time_ago(alert.created_at),
+            "time": format_time_ago(alert.created_at, now),
             "dismissible": alert.dismissible
         })
     
@@ -56,13 +80,15 @@ def dismiss_alert(
     db.commit()
     return {"message": "Alert dismissed"}
 
-@router.get("/users")
-def get_all_users(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_admin_user)
-):
-    users = db.query(User).order_by(User.created_at.desc()).all()
-    return users
+@router.get("/users", response_class=StreamingResponse)
+def get_all_users(current_user = Depends(get_admin_user)):
+    # Stream the JSON array in batches instead of loading every user at once
+    return stream_json_array(
+        lambda db: db.execute(
+            select(User).order_by(User.created_at.desc()).execution_options(yield_per=USER_STREAM_BATCH_SIZE)
+        ).scalars(),
+        UserSchema
+    )
 
 @router.patch("/users/{user_id}/toggle-status")
 def toggle_user_status(
@@ -79,6 +105,7 @@ def toggle_user_status(
     
     user.is_active = not user.is_active
     db.commit()
+    invalidate_user_cache(user_id)
     
     status = "activated" if user.is_active else "blocked"
     return {"message": f"User {status} successfully", "is_active": user.is_active}
@@ -99,17 +126,19 @@ def delete_user(
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
     
     try:
-        # Delete passengers from user's bookings
-        bookings = db.query(Booking).filter(Booking.user_id == user_id).all()
-        for booking in bookings:
-            db.query(Passenger).filter(Passenger.booking_id == booking.id).delete()
+        # Delete passengers from user's bookings in one statement
+        user_booking_ids = db.query(Booking.id).filter(Booking.user_id == user_id)
+        db.query(Passenger).filter(
+            Passenger.booking_id.in_(user_booking_ids.scalar_subquery())
+        ).delete(synchronize_session=False)
         
         # Delete user's bookings
-        db.query(Booking).filter(Booking.user_id == user_id).delete()
+        db.query(Booking).filter(Booking.user_id == user_id).delete(synchronize_session=False)
         
         # Delete the user
         db.delete(user)
         db.commit()
+        invalidate_user_cache(user_id)
         return {"message": "User deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -119,123 +148,106 @@ def generate_system_alerts(db: Session):
     alerts = []
     now = datetime.utcnow()
     
-    # Check for inactive trains
-    inactive_trains = db.query(Train).filter(Train.is_active == False).count()
-    if inactive_trains > 0:
-        # Check if this alert already exists in last hour
-        existing = db.query(SystemAlert).filter(
+    # Gather all system condition counts in a single round trip
+    counts = db.query(
+        db.query(func.count(Train.id))
+        .filter(Train.is_active == False)
+        .scalar_subquery()
+        .label("inactive_trains"),
+        db.query(func.count(Booking.id))
+        .filter(Booking.booking_date > now - timedelta(hours=1))
+        .scalar_subquery()
+        .label("recent_bookings"),
+        db.query(func.count(TrainSchedule.id))
+        .filter(
             and_(
-                SystemAlert.title == "Inactive Trains",
-                SystemAlert.created_at > now - timedelta(hours=1),
-                SystemAlert.is_active == True
-            )
-        ).first()
-        
-        if not existing:
-            alert = SystemAlert(
-                alert_type=AlertType.warning,
-                title="Inactive Trains",
-                message=f"{inactive_trains} train(s) are currently inactive",
-                icon="train",
-                dismissible=True
+                TrainSchedule.available_seats < 10,
+                TrainSchedule.schedule_date >= datetime.now().date()
             )
-            db.add(alert)
-            db.commit()
-            db.refresh(alert)
-            
-            alerts.append({
-                "id": str(alert.id),
-                "type": "warning",
-                "icon": "train",
-                "title": "Inactive Trains",
-                "message": f"{inactive_trains} train(s) are currently inactive",
-                "time": "Just now",
-                "dismissible": True
-            })
+        )
+        .scalar_subquery()
+        .label("low_seat_schedules"),
+    ).one()
     
-    # Check for high booking volume (more than 5 bookings in last hour)
-    recent_bookings = db.query(Booking).filter(
-        Booking.booking_date > now - timedelta(hours=1)
-    ).count()
+    # (title, dedupe window, type, icon, message) for each triggered condition
+    candidates = []
     
-    if recent_bookings > 5:
-        existing = db.query(SystemAlert).filter(
-            and_(
-                SystemAlert.title == "High Booking Volume",
-                SystemAlert.created_at > now - timedelta(hours=1),
-                SystemAlert.is_active == True
-            )
-        ).first()
-        
-        if not existing:
-            alert = SystemAlert(
-                alert_type=AlertType.info,
-                title="High Booking Volume",
-                message=f"{recent_bookings} bookings in the last hour",
-                icon="chart-line",
-                dismissible=True
-            )
-            db.add(alert)
-            db.commit()
-            db.refresh(alert)
-            
-            alerts.append({
-                "id": str(alert.id),
-                "type": "info",
-                "icon": "chart-line",
-                "title": "High Booking Volume",
-                "message": f"{recent_bookings} bookings in the last hour",
-                "time": "Just now",
-                "dismissible": True
-            })
+    # Check for inactive trains
+    if counts.inactive_trains > 0:
+        candidates.append((
+            "Inactive Trains", timedelta(hours=1), AlertType.warning, "train",
+            f"{counts.inactive_trains} train(s) are currently inactive"
+        ))
+    
+    # Check for high booking volume (more than 5 bookings in last hour)
+    if counts.recent_bookings > 5:
+        candidates.append((
+            "High Booking Volume", timedelta(hours=1), AlertType.info, "chart-line",
+            f"{counts.recent_bookings} bookings in the last hour"
+        ))
     
     # Check for low seat availability
-    low_seat_schedules = db.query(TrainSchedule).filter(
-        and_(
-            TrainSchedule.available_seats < 10,
-            TrainSchedule.schedule_date >= datetime.now().date()
+    if counts.low_seat_schedules > 0:
+        candidates.append((
+            "Low Seat Availability", timedelta(hours=2), AlertType.warning, "exclamation-triangle",
+            f"{counts.low_seat_schedules} schedule(s) have less than 10 seats available"
+        ))
+    
+    if not candidates:
+        return alerts
+    
+    # Check which of these alerts already exist within their window in one query
+    existing_titles = {
+        title for (title,) in db.query(SystemAlert.title).filter(
+            SystemAlert.is_active == True,
+            or_(*[
+                and_(SystemAlert.title == title, SystemAlert.created_at > now - window)
+                for title, window, _, _, _ in candidates
+            ])
+        ).all()
+    }
+    
+    new_alerts = []
+    for title, _, alert_type, icon, message in candidates:
+        if title in existing_titles:
+            continue
+        alert = SystemAlert(
+            alert_type=alert_type,
+            title=title,
+            message=message,
+            icon=icon,
+            dismissible=True
         )
-    ).count()
+        db.add(alert)
+        new_alerts.append(alert)
     
-    if low_seat_schedules > 0:
-        existing = db.query(SystemAlert).filter(
-            and_(
-                SystemAlert.title == "Low Seat Availability",
-                SystemAlert.created_at > now - timedelta(hours=2),
-                SystemAlert.is_active == True
-            )
-        ).first()
-        
-        if not existing:
-            alert = SystemAlert(
-                alert_type=AlertType.warning,
-                title="Low Seat Availability",
-                message=f"{low_seat_schedules} schedule(s) have less than 10 seats available",
-                icon="exclamation-triangle",
-                dismissible=True
-            )
-            db.add(alert)
-            db.commit()
-            db.refresh(alert)
-            
-            alerts.append({
-                "id": str(alert.id),
-                "type": "warning",
-                "icon": "exclamation-triangle",
-                "title": "Low Seat Availability",
-                "message": f"{low_seat_schedules} schedule(s) have less than 10 seats available",
-                "time": "Just now",
-                "dismissible": True
-            })
+    if not new_alerts:
+        return alerts
+    
+    db.flush()  # Assign alert IDs
+    
+    for alert in new_alerts:
+        alerts.append({
+            "id": str(alert.id),
+            "type": alert.alert_type.value,
+            "icon": alert.icon,
+            "title": alert.title,
+            "message": alert.message,
+            "time": "Just now",
+            "dismissible": True
+        })
+    
+    db.commit()
     
     return alerts
 
-@router.get("/refund-requests", response_model=List[RefundRequest])
-def get_pending_refund_requests(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_admin_user)
-):
-    return RefundService.get_pending_refund_requests(db)
+@router.get("/refund-requests", response_class=StreamingResponse)
+def get_pending_refund_requests(current_user = Depends(get_admin_user)):
+    # Stream the JSON array in batches like the user list, on the stream's own session
+    return stream_json_array(
+        lambda db: RefundService.get_pending_refund_requests(db, REFUND_STREAM_BATCH_SIZE),
+        RefundRequest
+    )
 
 @router.put("/refund-requests/{request_id}/approve")
 def approve_refund_request(
@@ -262,17 +274,14 @@ def reject_refund_request(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-def format_time_ago(dt):
-    now = datetime.utcnow()
-    diff = now - dt
+_TIME_AGO_UNITS = ((86400, "day"), (3600, "hour"), (60, "minute"))
+
+def format_time_ago(dt, now=None):
+    total = ((now or datetime.utcnow()) - dt).total_seconds()
+    
+    for seconds, unit in _TIME_AGO_UNITS:
+        count = int(total // seconds)
+        if count > 0:
+            return f"{count} {unit}{'s' if count > 1 else ''} ago"
     
-    if diff.days > 0:
-        return f"{diff.days} day{'s' if diff.days > 1 else ''} ago"
-    elif diff.seconds > 3600:
-        hours = diff.seconds // 3600
-        return f"{hours} hour{'s' if hours > 1 else ''} ago"
-    elif diff.seconds > 60:
-        minutes = diff.seconds // 60
-        return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
-    else:
-        return "Just now"
\ No newline at end of file
+    return "Just now"
\ No newline at end of file
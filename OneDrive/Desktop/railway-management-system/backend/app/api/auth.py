@@ -1,29 +1,72 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from app.core.database import get_db
+from typing import Dict, Tuple
+from app.core.cache import redis_client
+from app.core.database import get_db, get_async_db
 from app.core.security import create_access_token, verify_token, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.schemas import UserCreate, UserLogin, Token, User
 from app.models import User as UserModel
-from app.services import UserService
+from app.services import UserService, USER_BY_USERNAME
+import logging
+import threading
+import time
+import redis
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 security = HTTPBearer()
+logger = logging.getLogger(__name__)
+
+# Short-lived per-process cache of authenticated users keyed by bearer token
+AUTH_CACHE_TTL_SECONDS = 30
+AUTH_CACHE_MAX_SIZE = 10_000
+_auth_cache: Dict[str, Tuple[float, float, User]] = {}
+_auth_cache_lock = threading.Lock()
+
+# Redis key recording when a user's account last changed; shared by all workers
+# and only needs to outlive the cache entries it invalidates
+AUTH_REVOKED_KEY = "auth:revoked:{}"
+
+def invalidate_user_cache(user_id: int):
+    """Drop cached authentications for a user whose account has changed, in every worker."""
+    with _auth_cache_lock:
+        for token in [t for t, (_, _, user) in _auth_cache.items() if user.id == user_id]:
+            del _auth_cache[token]
+    try:
+        redis_client.setex(AUTH_REVOKED_KEY.format(user_id), AUTH_CACHE_TTL_SECONDS, time.time())
+    except redis.RedisError as e:
+        logger.warning(f"Auth cache invalidation failed for user {user_id}: {e}")
+
+def _cached_user(token: str, now: float):
+    """Return the cached user for a token unless it expired or was revoked by any worker."""
+    cached = _auth_cache.get(token)
+    if not cached or cached[0] <= now:
+        return None
+    _, cached_at, user = cached
+    try:
+        revoked_at = redis_client.get(AUTH_REVOKED_KEY.format(user.id))
+    except redis.RedisError as e:
+        # Without the shared revocation state the snapshot can't be trusted
+        logger.warning(f"Auth cache check failed for user {user.id}: {e}")
+        return None
+    if revoked_at is not None and float(revoked_at) >= cached_at:
+        return None
+    return user
 
 @router.post("/register", response_model=User)
 def register(user: UserCreate, db: Session = Depends(get_db)):
     # Check if username already exists
-    existing_user = UserService.get_user_by_username(db, user.username)
-    if existing_user:
+    if UserService.username_exists(db, user.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
     # Check if email already exists
-    existing_email = db.query(UserModel).filter(UserModel.email == user.email).first()
-    if existing_email:
+    if db.query(db.query(UserModel).filter(UserModel.email == user.email).exists()).scalar():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -58,30 +101,66 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
         "user": user
     }
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    payload = verify_token(credentials.credentials)
-    username = payload.get("sub")
-    if username is None:
+def _token_payload(token: str) -> dict:
+    payload = verify_token(token)
+    if payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
-    user = UserService.get_user_by_username(db, username)
-    if user is None:
+    return payload
+
+def _cache_user(token: str, payload: dict, db_user, now: float) -> User:
+    if db_user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
+    # Cache a detached snapshot so it stays usable outside this session
+    user = User.model_validate(db_user)
+    expires_at = min(now + AUTH_CACHE_TTL_SECONDS, payload.get("exp", now))
+    with _auth_cache_lock:
+        if len(_auth_cache) >= AUTH_CACHE_MAX_SIZE:
+            _auth_cache.pop(next(iter(_auth_cache)))
+        _auth_cache[token] = (expires_at, now, user)
+    return user
+
+def _active_user(user: User) -> User:
     # Check if user is banned
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Your account has been temporarily blocked. Please contact the administrator."
         )
-    
     return user
 
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    token = credentials.credentials
+    now = time.time()
+    
+    user = _cached_user(token, now)
+    if user is None:
+        payload = _token_payload(token)
+        db_user = UserService.get_user_by_username(db, payload["sub"])
+        user = _cache_user(token, payload, db_user, now)
+    
+    return _active_user(user)
+
+async def get_current_user_async(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
+    """get_current_user for async handlers, so they don't also check out a sync session."""
+    token = credentials.credentials
+    now = time.time()
+    
+    # The Redis revocation check is blocking, so keep it off the event loop
+    user = await run_in_threadpool(_cached_user, token, now)
+    if user is None:
+        payload = _token_payload(token)
+        result = await db.execute(USER_BY_USERNAME, {"username": payload["sub"]})
+        user = _cache_user(token, payload, result.scalar_one_or_none(), now)
+    
+    return _active_user(user)
+
 @router.get("/me", response_model=User)
 def get_current_user_info(current_user = Depends(get_current_user)):
     return current_user
@@ -96,8 +175,7 @@ def check_password_strength(password_data: dict):
 @router.post("/check-username")
 def check_username(username_data: dict, db: Session = Depends(get_db)):
     username = username_data.get('username', '')
-    existing_user = UserService.get_user_by_username(db, username)
-    if existing_user:
+    if UserService.username_exists(db, username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already exists"
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
-from app.schemas import Booking, BookingCreate
+from app.schemas import BOOKING_LIST_ADAPTER, Booking, BookingCreate
 from app.services import BookingService
 from app.api.auth import get_current_user
 
@@ -33,7 +33,12 @@ def get_my_bookings(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    return BookingService.get_user_bookings(db, current_user.id)
+    bookings = BookingService.get_user_bookings(db, current_user.id)
+    # Validate and encode straight to JSON bytes with the prebuilt adapter
+    return Response(
+        content=BOOKING_LIST_ADAPTER.dump_json(BOOKING_LIST_ADAPTER.validate_python(bookings, from_attributes=True)),
+        media_type="application/json"
+    )
 
 @router.get("/{booking_id}", response_model=Booking)
 def get_booking(
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import and_, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from decimal import Decimal
-import uuid
+import re
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
+from app.core.ids import uuid7_str
 from app.models.payment import CreditCard, Wallet, WalletTransaction, Payment, PaymentStatus, PaymentMethod, UpiId, CardTransaction, UpiTransaction
 from app.models import User, Booking
 from app.schemas.payment import (
@@ -13,10 +17,41 @@ from app.schemas.payment import (
     WalletAddMoney, Wallet as WalletSchema, WalletTransaction as WalletTransactionSchema, 
     PaymentCreate, Payment as PaymentSchema
 )
-from app.api.auth import get_current_user
+from app.schemas import orm_response
+from app.api.auth import get_current_user, get_current_user_async
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
+CARD_NUMBER_RE = re.compile(r"[0-9]{16}")
+CVV_RE = re.compile(r"[0-9]{3}")
+UPI_ID_RE = re.compile(r"[\w.\-]+@[\w.\-]+")
+
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+
+def paginate_history(stmt, model, before_id: Optional[int], limit: Optional[int]):
+    """Order a history query newest first, paging only when the caller asks for it.
+    
+    Without before_id or limit the full history is returned. Paging continues after
+    the row before_id, HISTORY_PAGE_SIZE rows at a time unless limit is given.
+    """
+    stmt = stmt.order_by(model.created_at.desc(), model.id.desc())
+    if before_id is not None:
+        # Keyset on (created_at, id) so the page is a bounded index range scan
+        cursor_created_at = select(model.created_at).where(model.id == before_id).scalar_subquery()
+        stmt = stmt.where(tuple_(model.created_at, model.id) < tuple_(cursor_created_at, before_id))
+        limit = limit or HISTORY_PAGE_SIZE
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+def debit_balance(db: Session, model, account_id: int, amount: Decimal) -> bool:
+    """Subtract amount from an account's balance in one conditional UPDATE. Returns False if it does not cover it."""
+    updated = db.query(model).filter(model.id == account_id, model.balance >= amount).update(
+        {model.balance: model.balance - amount}, synchronize_session=False
+    )
+    return updated == 1
+
 # Credit Card endpoints
 @router.post("/credit-cards", response_model=CreditCardSchema)
 def add_credit_card(
@@ -25,19 +60,16 @@ def add_credit_card(
     current_user: User = Depends(get_current_user)
 ):
     # Validate card number is exactly 16 digits
-    if len(card_data.card_number) != 16 or not card_data.card_number.isdigit():
+    if not CARD_NUMBER_RE.fullmatch(card_data.card_number):
         raise HTTPException(status_code=400, detail="Card number must be exactly 16 digits")
     
     # Validate CVV is exactly 3 digits
-    if len(card_data.cvv) != 3 or not card_data.cvv.isdigit():
+    if not CVV_RE.fullmatch(card_data.cvv):
         raise HTTPException(status_code=400, detail="CVV must be exactly 3 digits")
     
-    # Mask card number for storage (in production, use proper encryption)
-    masked_number = "**** **** **** " + card_data.card_number[-4:]
-    
     credit_card = CreditCard(
         user_id=current_user.id,
-        card_number=masked_number,
+        card_number=card_data.masked_number,  # Masked for storage (in production, use proper encryption)
         cardholder_name=card_data.cardholder_name,
         expiry_month=card_data.expiry_month,
         expiry_year=card_data.expiry_year,
@@ -51,12 +83,13 @@ def add_credit_card(
     db.refresh(credit_card)
     return credit_card
 
-@router.get("/credit-cards", response_model=List[CreditCardSchema])
-def get_credit_cards(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/credit-cards")
+async def get_credit_cards(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    return db.query(CreditCard).filter(CreditCard.user_id == current_user.id, CreditCard.is_active == True).all()
+    cards = await db.scalars(select(CreditCard).where(CreditCard.user_id == current_user.id, CreditCard.is_active == True))
+    return [orm_response(CreditCardSchema, card) for card in cards]
 
 @router.delete("/credit-cards/{card_id}")
 def delete_credit_card(
@@ -72,32 +105,48 @@ def delete_credit_card(
     db.commit()
     return {"message": "Credit card deleted successfully"}
 
-@router.get("/credit-cards/{card_id}/transactions", response_model=List[CardTransactionSchema])
-def get_card_transactions(
+@router.get("/credit-cards/{card_id}/transactions")
+async def get_card_transactions(
     card_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    before_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    card = db.query(CreditCard).filter(CreditCard.id == card_id, CreditCard.user_id == current_user.id).first()
+    card = await db.scalar(select(CreditCard.id).where(CreditCard.id == card_id, CreditCard.user_id == current_user.id))
     if not card:
         raise HTTPException(status_code=404, detail="Credit card not found")
     
-    return db.query(CardTransaction).filter(CardTransaction.card_id == card_id).order_by(CardTransaction.created_at.desc()).all()
+    transactions = await db.scalars(paginate_history(
+        select(CardTransaction).where(CardTransaction.card_id == card_id), CardTransaction, before_id, limit
+    ))
+    return [orm_response(CardTransactionSchema, transaction) for transaction in transactions]
 
 # Wallet endpoints
-@router.get("/wallet", response_model=WalletSchema)
+def get_or_create_wallet(db: Session, user_id: int):
+    """Load the user's wallet, creating it on first use. Returns (wallet, created)."""
+    wallet = db.query(Wallet).filter(Wallet.user_id == user_id).first()
+    if wallet:
+        return wallet, False
+    
+    try:
+        with db.begin_nested():
+            wallet = Wallet(user_id=user_id, balance=Decimal('0.00'))
+            db.add(wallet)
+    except IntegrityError:
+        # A concurrent request created it first (user_id is unique)
+        return db.query(Wallet).filter(Wallet.user_id == user_id).one(), False
+    return wallet, True
+
+@router.get("/wallet")
 def get_wallet(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-    if not wallet:
-        # Create wallet if doesn't exist
-        wallet = Wallet(user_id=current_user.id, balance=Decimal('0.00'))
-        db.add(wallet)
+    wallet, created = get_or_create_wallet(db, current_user.id)
+    if created:
         db.commit()
-        db.refresh(wallet)
-    return wallet
+    return orm_response(WalletSchema, wallet)
 
 @router.post("/wallet/add-money")
 def add_money_to_wallet(
@@ -105,14 +154,12 @@ def add_money_to_wallet(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-    if not wallet:
-        wallet = Wallet(user_id=current_user.id, balance=Decimal('0.00'))
-        db.add(wallet)
-        db.flush()
+    wallet, _ = get_or_create_wallet(db, current_user.id)
     
-    # Add money to wallet
-    wallet.balance += money_data.amount
+    # Add money to wallet in the database so concurrent credits are not lost
+    db.query(Wallet).filter(Wallet.id == wallet.id).update(
+        {Wallet.balance: Wallet.balance + money_data.amount}, synchronize_session=False
+    )
     
     # Create transaction record
     transaction = WalletTransaction(
@@ -120,7 +167,7 @@ def add_money_to_wallet(
         transaction_type="credit",
         amount=money_data.amount,
         description="Money added to wallet",
-        reference_id=str(uuid.uuid4())
+        reference_id=uuid7_str()
     )
     
     db.add(transaction)
@@ -128,16 +175,20 @@ def add_money_to_wallet(
     
     return {"message": "Money added successfully", "new_balance": wallet.balance}
 
-@router.get("/wallet/transactions", response_model=List[WalletTransactionSchema])
-def get_wallet_transactions(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/wallet/transactions")
+async def get_wallet_transactions(
+    before_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-    if not wallet:
-        return []
-    
-    return db.query(WalletTransaction).filter(WalletTransaction.wallet_id == wallet.id).order_by(WalletTransaction.created_at.desc()).all()
+    transactions = await db.scalars(paginate_history(
+        select(WalletTransaction)
+        .join(Wallet, WalletTransaction.wallet_id == Wallet.id)
+        .where(Wallet.user_id == current_user.id),
+        WalletTransaction, before_id, limit
+    ))
+    return [orm_response(WalletTransactionSchema, transaction) for transaction in transactions]
 
 # UPI ID endpoints (must come before generic payment endpoints)
 @router.post("/upi-ids", response_model=UpiIdSchema)
@@ -146,8 +197,8 @@ def add_upi_id(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Validate UPI ID format (basic validation)
-    if '@' not in upi_data.upi_id:
+    # Validate UPI ID format (name@handle)
+    if not UPI_ID_RE.fullmatch(upi_data.upi_id):
         raise HTTPException(status_code=400, detail="Invalid UPI ID format")
     
     upi_id = UpiId(
@@ -161,12 +212,13 @@ def add_upi_id(
     db.refresh(upi_id)
     return upi_id
 
-@router.get("/upi-ids", response_model=List[UpiIdSchema])
-def get_upi_ids(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/upi-ids")
+async def get_upi_ids(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    return db.query(UpiId).filter(UpiId.user_id == current_user.id, UpiId.is_active == True).all()
+    upi_ids = await db.scalars(select(UpiId).where(UpiId.user_id == current_user.id, UpiId.is_active == True))
+    return [orm_response(UpiIdSchema, upi) for upi in upi_ids]
 
 @router.delete("/upi-ids/{upi_id}")
 def delete_upi_id(
@@ -182,17 +234,22 @@ def delete_upi_id(
     db.commit()
     return {"message": "UPI ID deleted successfully"}
 
-@router.get("/upi-ids/{upi_id}/transactions", response_model=List[UpiTransactionSchema])
-def get_upi_transactions(
+@router.get("/upi-ids/{upi_id}/transactions")
+async def get_upi_transactions(
     upi_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    before_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    upi = db.query(UpiId).filter(UpiId.id == upi_id, UpiId.user_id == current_user.id).first()
+    upi = await db.scalar(select(UpiId.id).where(UpiId.id == upi_id, UpiId.user_id == current_user.id))
     if not upi:
         raise HTTPException(status_code=404, detail="UPI ID not found")
     
-    return db.query(UpiTransaction).filter(UpiTransaction.upi_id == upi_id).order_by(UpiTransaction.created_at.desc()).all()
+    transactions = await db.scalars(paginate_history(
+        select(UpiTransaction).where(UpiTransaction.upi_id == upi_id), UpiTransaction, before_id, limit
+    ))
+    return [orm_response(UpiTransactionSchema, transaction) for transaction in transactions]
 
 @router.post("/upi-ids/{upi_id}/deduct")
 def deduct_from_upi(
@@ -206,17 +263,15 @@ def deduct_from_upi(
         raise HTTPException(status_code=404, detail="UPI ID not found")
     
     amount = Decimal(str(deduct_data['amount']))
-    if upi.balance < amount:
+    if not debit_balance(db, UpiId, upi.id, amount):
         raise HTTPException(status_code=400, detail="Insufficient balance")
     
-    upi.balance -= amount
-    
     transaction = UpiTransaction(
         upi_id=upi.id,
         transaction_type="debit",
         amount=amount,
         description=deduct_data.get('description', 'Payment'),
-        reference_id=str(uuid.uuid4())
+        reference_id=uuid7_str()
     )
     
     db.add(transaction)
@@ -231,116 +286,122 @@ def process_payment(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Get booking
-    booking = db.query(Booking).filter(Booking.id == payment_data.booking_id, Booking.user_id == current_user.id).first()
-    if not booking:
+    # Get booking together with the paying account in one round trip
+    account_model = None
+    if payment_data.payment_method == PaymentMethod.WALLET:
+        account_model = Wallet
+        account_join = Wallet.user_id == Booking.user_id
+    elif payment_data.payment_method == PaymentMethod.CREDIT_CARD and payment_data.card_id:
+        account_model = CreditCard
+        account_join = and_(CreditCard.id == payment_data.card_id, CreditCard.user_id == Booking.user_id)
+    elif payment_data.payment_method == PaymentMethod.UPI and payment_data.upi_id:
+        account_model = UpiId
+        account_join = and_(UpiId.id == payment_data.upi_id, UpiId.user_id == Booking.user_id)
+    
+    query = db.query(Booking)
+    if account_model is not None:
+        query = query.add_entity(account_model).outerjoin(account_model, account_join)
+    row = query.filter(Booking.id == payment_data.booking_id, Booking.user_id == current_user.id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Booking not found")
+    booking, account = row if account_model is not None else (row, None)
     
-    # Check if payment already exists
-    existing_payment = db.query(Payment).filter(Payment.booking_id == booking.id).first()
-    if existing_payment:
-        raise HTTPException(status_code=400, detail="Payment already processed for this booking")
+    total_amount = booking.total_amount
+    description = f"Payment for booking {booking.booking_reference}"
+    reference_id = str(booking.id)
     
-    # Process payment based on method
+    # Validate the paying account before writing anything
     if payment_data.payment_method == PaymentMethod.WALLET:
-        wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-        if not wallet or wallet.balance < booking.total_amount:
+        if not account:
             raise HTTPException(status_code=400, detail="Insufficient wallet balance")
-        
-        # Deduct from wallet
-        wallet.balance -= booking.total_amount
-        
-        # Create wallet transaction
-        wallet_transaction = WalletTransaction(
-            wallet_id=wallet.id,
+        insufficient_detail = "Insufficient wallet balance"
+        transaction = WalletTransaction(
+            wallet_id=account.id,
             transaction_type="debit",
-            amount=booking.total_amount,
-            description=f"Payment for booking {booking.booking_reference}",
-            reference_id=str(booking.id)
+            amount=total_amount,
+            description=description,
+            reference_id=reference_id
         )
-        db.add(wallet_transaction)
     
     elif payment_data.payment_method == PaymentMethod.CREDIT_CARD:
         if not payment_data.card_id:
             raise HTTPException(status_code=400, detail="Card ID required for credit card payment")
-        
-        card = db.query(CreditCard).filter(CreditCard.id == payment_data.card_id, CreditCard.user_id == current_user.id).first()
-        if not card or not card.is_active:
+        if not account or not account.is_active:
             raise HTTPException(status_code=404, detail="Credit card not found")
-        
-        if card.balance < booking.total_amount:
-            raise HTTPException(status_code=400, detail="Insufficient card balance")
-        
-        # Deduct from card
-        card.balance -= booking.total_amount
-        
-        # Create card transaction
-        card_transaction = CardTransaction(
-            card_id=card.id,
+        insufficient_detail = "Insufficient card balance"
+        transaction = CardTransaction(
+            card_id=account.id,
             transaction_type="debit",
-            amount=booking.total_amount,
-            description=f"Payment for booking {booking.booking_reference}",
-            reference_id=str(booking.id)
+            amount=total_amount,
+            description=description,
+            reference_id=reference_id
         )
-        db.add(card_transaction)
     
     elif payment_data.payment_method == PaymentMethod.UPI:
         if not payment_data.upi_id:
             raise HTTPException(status_code=400, detail="UPI ID required for UPI payment")
-        
-        upi = db.query(UpiId).filter(UpiId.id == payment_data.upi_id, UpiId.user_id == current_user.id).first()
-        if not upi or not upi.is_active:
+        if not account or not account.is_active:
             raise HTTPException(status_code=404, detail="UPI ID not found")
-        
-        if upi.balance < booking.total_amount:
-            raise HTTPException(status_code=400, detail="Insufficient UPI balance")
-        
-        # Deduct from UPI
-        upi.balance -= booking.total_amount
-        
-        # Create UPI transaction
-        upi_transaction = UpiTransaction(
-            upi_id=upi.id,
+        insufficient_detail = "Insufficient UPI balance"
+        transaction = UpiTransaction(
+            upi_id=account.id,
             transaction_type="debit",
-            amount=booking.total_amount,
-            description=f"Payment for booking {booking.booking_reference}",
-            reference_id=str(booking.id)
+            amount=total_amount,
+            description=description,
+            reference_id=reference_id
         )
-        db.add(upi_transaction)
     
     # Create payment record
     payment = Payment(
         booking_id=booking.id,
         user_id=current_user.id,
-        amount=booking.total_amount,
+        amount=total_amount,
         payment_method=payment_data.payment_method,
         status=PaymentStatus.completed,
-        transaction_id=str(uuid.uuid4())
+        transaction_id=uuid7_str()
     )
     
-    db.add(payment)
+    try:
+        with db.begin_nested():
+            # Insert the payment first so the unique booking_id rejects a duplicate before any debit
+            db.add(payment)
+            db.flush()
+            
+            # Deduct from the account and record the transaction
+            if account_model is not None:
+                if not debit_balance(db, account_model, account.id, total_amount):
+                    raise HTTPException(status_code=400, detail=insufficient_detail)
+                db.add(transaction)
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail="Payment already processed for this booking")
+    
     db.commit()
     db.refresh(payment)
     
     return payment
 
-@router.get("/", response_model=List[PaymentSchema])
-def get_payments(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/")
+async def get_payments(
+    before_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    return db.query(Payment).filter(Payment.user_id == current_user.id).order_by(Payment.created_at.desc()).all()
+    payments = await db.scalars(paginate_history(
+        select(Payment).where(Payment.user_id == current_user.id), Payment, before_id, limit
+    ))
+    return [orm_response(PaymentSchema, payment) for payment in payments]
 
-@router.get("/{payment_id}", response_model=PaymentSchema)
-def get_payment(
+@router.get("/{payment_id}")
+async def get_payment(
     payment_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    payment = db.query(Payment).filter(Payment.id == payment_id, Payment.user_id == current_user.id).first()
+    payment = await db.scalar(select(Payment).where(Payment.id == payment_id, Payment.user_id == current_user.id))
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
-    return payment
+    return orm_response(PaymentSchema, payment)
 
 @router.post("/credit-cards/{card_id}/deduct")
 def deduct_from_card(
@@ -354,17 +415,15 @@ def deduct_from_card(
         raise HTTPException(status_code=404, detail="Card not found")
     
     amount = Decimal(str(deduct_data['amount']))
-    if card.balance < amount:
+    if not debit_balance(db, CreditCard, card.id, amount):
         raise HTTPException(status_code=400, detail="Insufficient balance")
     
-    card.balance -= amount
-    
     transaction = CardTransaction(
         card_id=card.id,
         transaction_type="debit",
         amount=amount,
         description=deduct_data.get('description', 'Payment'),
-        reference_id=str(uuid.uuid4())
+        reference_id=uuid7_str()
     )
     
     db.add(transaction)
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
+from app.core.cache import cache_response, invalidate_cache, ROUTES_CACHE_KEY
 from app.schemas import Route, RouteCreate
 from app.services import RouteService
 from app.api.auth import get_admin_user, get_current_user
@@ -15,16 +16,19 @@ def create_route(
     current_user = Depends(get_admin_user)
 ):
     try:
-        return RouteService.create_route(db, route)
+        db_route = RouteService.create_route(db, route)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    invalidate_cache(ROUTES_CACHE_KEY)
+    return db_route
 
 @router.get("/", response_model=List[Route])
+@cache_response(ROUTES_CACHE_KEY)
 def get_routes(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    return RouteService.get_all_routes(db)
+    return [Route.model_validate(route) for route in RouteService.get_all_routes(db)]
 
 @router.get("/{route_id}", response_model=Route)
 def get_route(
@@ -47,6 +51,7 @@ def update_route(
     updated_route = RouteService.update_route(db, route_id, route)
     if not updated_route:
         raise HTTPException(status_code=404, detail="Route not found")
+    invalidate_cache(ROUTES_CACHE_KEY)
     return updated_route
 
 @router.post("/bulk-create-schedules")
@@ -57,12 +62,9 @@ def bulk_create_schedules(
 ):
     """Create schedules for all active routes"""
     try:
-        routes = RouteService.get_all_routes(db)
-        created_count = 0
-        
-        for route in routes:
-            RouteService.create_schedules_for_route(db, route.id, days_ahead)
-            created_count += 1
+        route_ids = [route.id for route in RouteService.get_all_routes(db)]
+        RouteService.create_schedules_for_routes(db, route_ids, days_ahead)
+        created_count = len(route_ids)
         
         return {"message": f"Schedules created for {created_count} routes for next {days_ahead} days"}
     except Exception as e:
@@ -91,4 +93,5 @@ def delete_route(
     result = RouteService.delete_route(db, route_id)
     if not result:
         raise HTTPException(status_code=404, detail="Route not found")
+    invalidate_cache(ROUTES_CACHE_KEY)
     return result
\ No newline at end of file
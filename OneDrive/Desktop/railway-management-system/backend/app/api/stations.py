@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
 from app.core.database import get_db
-from app.schemas import Station, StationCreate
+from app.core.cache import cache_response, invalidate_cache, STATIONS_CACHE_KEY
+from app.schemas import Station, StationCreate, orm_response
 from app.services import StationService
 from app.api.auth import get_admin_user, get_current_user
 
@@ -14,13 +14,16 @@ def create_station(
     db: Session = Depends(get_db),
     current_user = Depends(get_admin_user)
 ):
-    return StationService.create_station(db, station)
+    db_station = StationService.create_station(db, station)
+    invalidate_cache(STATIONS_CACHE_KEY)
+    return db_station
 
-@router.get("/", response_model=List[Station])
+@router.get("/")
+@cache_response(STATIONS_CACHE_KEY)
 def get_stations(db: Session = Depends(get_db)):
-    return StationService.get_all_stations(db)
+    return [orm_response(Station, station) for station in StationService.get_all_stations(db)]
 
-@router.get("/{station_id}", response_model=Station)
+@router.get("/{station_id}")
 def get_station(
     station_id: int,
     db: Session = Depends(get_db),
@@ -32,4 +35,4 @@ def get_station(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Station not found"
         )
-    return station
\ No newline at end of file
+    return orm_response(Station, station)
\ No newline at end of file
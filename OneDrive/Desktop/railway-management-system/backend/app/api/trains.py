@@ -2,7 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
-from app.schemas import Train, TrainCreate, TrainSearchRequest, TrainSearchResponse
+from app.core.cache import (
+    cache_response, invalidate_cache, TRAINS_CACHE_KEY, ROUTES_CACHE_KEY,
+    ADMIN_DASHBOARD_CACHE_KEY, ADMIN_DASHBOARD_CACHE_TTL_SECONDS
+)
+from app.schemas import Train, TrainCreate, TrainSearchRequest, TrainSearchResponse, orm_response
 from app.models import Train as TrainModel, Route as RouteModel, TrainSchedule as TrainScheduleModel
 from app.services import TrainService
 from app.api.auth import get_admin_user, get_current_user
@@ -16,15 +20,18 @@ def create_train(
     current_user = Depends(get_admin_user)
 ):
     try:
-        return TrainService.create_train(db, train)
+        db_train = TrainService.create_train(db, train)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    invalidate_cache(TRAINS_CACHE_KEY)
+    return db_train
 
-@router.get("/", response_model=List[Train])
+@router.get("/")
+@cache_response(TRAINS_CACHE_KEY)
 def get_trains(db: Session = Depends(get_db)):
-    return TrainService.get_all_trains(db)
+    return [orm_response(Train, train) for train in TrainService.get_all_trains(db)]
 
-@router.get("/{train_id}", response_model=Train)
+@router.get("/{train_id}")
 def get_train(
     train_id: int,
     db: Session = Depends(get_db),
@@ -33,7 +40,7 @@ def get_train(
     train = TrainService.get_train(db, train_id)
     if not train:
         raise HTTPException(status_code=404, detail="Train not found")
-    return train
+    return orm_response(Train, train)
 
 @router.put("/{train_id}", response_model=Train)
 def update_train(
@@ -45,6 +52,7 @@ def update_train(
     updated_train = TrainService.update_train(db, train_id, train)
     if not updated_train:
         raise HTTPException(status_code=404, detail="Train not found")
+    invalidate_cache(TRAINS_CACHE_KEY, ROUTES_CACHE_KEY)
     return updated_train
 
 @router.patch("/{train_id}/toggle-status")
@@ -56,6 +64,7 @@ def toggle_train_status(
     result = TrainService.toggle_train_status(db, train_id)
     if not result:
         raise HTTPException(status_code=404, detail="Train not found")
+    invalidate_cache(TRAINS_CACHE_KEY, ROUTES_CACHE_KEY)
     return result
 
 @router.patch("/sync-routes")
@@ -65,6 +74,7 @@ def sync_routes_with_trains(
 ):
     """Sync all routes status with their associated trains"""
     result = TrainService.sync_routes_with_trains(db)
+    invalidate_cache(ROUTES_CACHE_KEY)
     return result
 
 @router.delete("/{train_id}")
@@ -76,9 +86,11 @@ def delete_train(
     result = TrainService.delete_train(db, train_id)
     if not result:
         raise HTTPException(status_code=404, detail="Train not found")
+    invalidate_cache(TRAINS_CACHE_KEY, ROUTES_CACHE_KEY)
     return result
 
 @router.get("/admin/dashboard")
+@cache_response(ADMIN_DASHBOARD_CACHE_KEY, ttl=ADMIN_DASHBOARD_CACHE_TTL_SECONDS)
 def get_admin_dashboard(
     db: Session = Depends(get_db),
     current_user = Depends(get_admin_user)
@@ -0,0 +1,75 @@
+import logging
+import time
+from functools import wraps
+from typing import Dict, Tuple, Union
+
+import orjson
+import redis
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = 300
+
+STATIONS_CACHE_KEY = "stations:all"
+TRAINS_CACHE_KEY = "trains:all"
+ROUTES_CACHE_KEY = "routes:all"
+ADMIN_DASHBOARD_CACHE_KEY = "admin:dashboard"
+ADMIN_DASHBOARD_CACHE_TTL_SECONDS = 30
+
+# Per-process copy of cached payloads in front of Redis. Kept short because writes
+# handled by other workers can only clear it through Redis.
+LOCAL_CACHE_TTL_SECONDS = 5
+_local_cache: Dict[str, Tuple[float, Union[str, bytes]]] = {}
+
+redis_client = redis.Redis.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    socket_timeout=0.5,
+    socket_connect_timeout=0.5,
+)
+
+
+def cache_response(key: str, ttl: int = CACHE_TTL_SECONDS):
+    """Serve a read endpoint from Redis, falling back to the database if Redis is unavailable."""
+    local_ttl = min(LOCAL_CACHE_TTL_SECONDS, ttl)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            now = time.monotonic()
+            local = _local_cache.get(key)
+            if local and local[0] > now:
+                return Response(content=local[1], media_type="application/json")
+
+            try:
+                cached = redis_client.get(key)
+            except redis.RedisError as e:
+                logger.warning(f"Cache read failed for {key}: {e}")
+                cached = None
+            if cached is not None:
+                _local_cache[key] = (now + local_ttl, cached)
+                return Response(content=cached, media_type="application/json")
+
+            payload = orjson.dumps(jsonable_encoder(func(*args, **kwargs)))
+            try:
+                redis_client.setex(key, ttl, payload)
+            except redis.RedisError as e:
+                logger.warning(f"Cache write failed for {key}: {e}")
+            _local_cache[key] = (now + local_ttl, payload)
+            return Response(content=payload, media_type="application/json")
+        return wrapper
+    return decorator
+
+
+def invalidate_cache(*keys: str):
+    """Drop cached read results after a write."""
+    for key in keys:
+        _local_cache.pop(key, None)
+    try:
+        redis_client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Cache invalidation failed for {keys}: {e}")
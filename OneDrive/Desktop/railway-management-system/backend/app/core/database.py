@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import settings
 import logging
@@ -10,13 +11,43 @@ class Base(DeclarativeBase):
     pass
 
 
+IS_SQLITE = make_url(settings.DATABASE_URL).get_backend_name() == "sqlite"
+
+# SQLite brings its own pool classes, which take none of the sizing options
+POOL_OPTIONS = {} if IS_SQLITE else {
+    "pool_size": settings.DATABASE_POOL_SIZE,
+    "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+    "pool_recycle": 1800,
+    "pool_timeout": 30,
+    "pool_use_lifo": True,
+}
+
 # Create engine
+# The database must allow at least 2 x (pool_size + max_overflow) x worker count connections,
+# since the sync and async engines each keep their own pool
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
+    **POOL_OPTIONS,
     echo=settings.DEBUG,
 )
 
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new SQLite connection for concurrent use."""
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers run alongside the single writer
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # Safe under WAL, skips an fsync per commit
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
+if IS_SQLITE:
+    event.listen(engine, "connect", set_sqlite_pragmas)
+
 # Create session factory
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -24,6 +55,42 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# asyncio driver for each backend, used for the async engine
+ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str):
+    """Swap the driver in DATABASE_URL for its asyncio counterpart."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url
+
+
+# Create async engine
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    **POOL_OPTIONS,
+    echo=settings.DEBUG,
+)
+
+if IS_SQLITE:
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+
+# Create async session factory
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 def get_db():
     """Dependency to get database session."""
@@ -38,6 +105,17 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Database session error: {e}")
+            raise
+
+
 def init_db():
     """Initialize database tables."""
     # Import all models to ensure they are registered
@@ -1,10 +1,11 @@
 from typing import Any, Dict, Optional
 from fastapi import HTTPException, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from datetime import datetime, timezone
 import logging
-import traceback
+import time
 from app.utils.correlation import get_correlation_id
 
 logger = logging.getLogger(__name__)
@@ -13,6 +14,8 @@ logger = logging.getLogger(__name__)
 class BaseAPIException(HTTPException):
     """Base exception for API errors."""
     
+    __slots__ = ("error_code",)
+    
     def __init__(
         self,
         status_code: int,
@@ -27,6 +30,8 @@ class BaseAPIException(HTTPException):
 class ValidationError(BaseAPIException):
     """Validation error."""
     
+    __slots__ = ("field",)
+    
     def __init__(self, detail: str, field: Optional[str] = None):
         super().__init__(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -39,6 +44,8 @@ class ValidationError(BaseAPIException):
 class NotFoundError(BaseAPIException):
     """Resource not found error."""
     
+    __slots__ = ()
+    
     def __init__(self, resource: str, identifier: Any = None):
         detail = f"{resource} not found"
         if identifier:
@@ -54,6 +61,8 @@ class NotFoundError(BaseAPIException):
 class ConflictError(BaseAPIException):
     """Resource conflict error."""
     
+    __slots__ = ()
+    
     def __init__(self, detail: str):
         super().__init__(
             status_code=status.HTTP_409_CONFLICT,
@@ -65,6 +74,8 @@ class ConflictError(BaseAPIException):
 class InsufficientSeatsError(BaseAPIException):
     """Insufficient seats available."""
     
+    __slots__ = ()
+    
     def __init__(self, available: int, requested: int):
         super().__init__(
             status_code=status.HTTP_409_CONFLICT,
@@ -76,6 +87,8 @@ class InsufficientSeatsError(BaseAPIException):
 class UnauthorizedError(BaseAPIException):
     """Unauthorized access error."""
     
+    __slots__ = ()
+    
     def __init__(self, detail: str = "Not authenticated"):
         super().__init__(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -87,6 +100,8 @@ class UnauthorizedError(BaseAPIException):
 class ForbiddenError(BaseAPIException):
     """Forbidden access error."""
     
+    __slots__ = ()
+    
     def __init__(self, detail: str = "Not enough permissions"):
         super().__init__(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -95,6 +110,20 @@ class ForbiddenError(BaseAPIException):
         )
 
 
+# Error timestamps only change once per second, so format each second once
+_timestamp_second = 0
+_timestamp_text = ""
+
+
+def _error_timestamp() -> str:
+    global _timestamp_second, _timestamp_text
+    second = int(time.time())
+    if second != _timestamp_second:
+        _timestamp_text = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        _timestamp_second = second
+    return _timestamp_text
+
+
 def create_error_response(
     status_code: int,
     message: str,
@@ -108,7 +137,7 @@ def create_error_response(
         "error": {
             "code": error_code,
             "message": message,
-            "timestamp": "2024-01-01T00:00:00Z",  # Use actual timestamp
+            "timestamp": _error_timestamp(),
         }
     }
     
@@ -126,7 +155,9 @@ async def base_api_exception_handler(request: Request, exc: BaseAPIException):
     correlation_id = get_correlation_id()
     
     logger.warning(
-        f"API Exception: {exc.error_code} - {exc.detail}",
+        "API Exception: %s - %s",
+        exc.error_code,
+        exc.detail,
         extra={
             "correlation_id": correlation_id,
             "status_code": exc.status_code,
@@ -136,7 +167,7 @@ async def base_api_exception_handler(request: Request, exc: BaseAPIException):
         }
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content=create_error_response(
             status_code=exc.status_code,
@@ -154,13 +185,14 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     errors = []
     for error in exc.errors():
         errors.append({
-            "field": ".".join(str(x) for x in error["loc"]),
+            "field": ".".join(map(str, error["loc"])),
             "message": error["msg"],
             "type": error["type"],
         })
     
     logger.warning(
-        f"Validation error: {len(errors)} validation errors",
+        "Validation error: %d validation errors",
+        len(errors),
         extra={
             "correlation_id": correlation_id,
             "errors": errors,
@@ -169,7 +201,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         }
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content=create_error_response(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -187,10 +219,11 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
     
     if isinstance(exc, IntegrityError):
         logger.warning(
-            f"Database integrity error: {str(exc)}",
+            "Database integrity error: %s",
+            exc,
             extra={"correlation_id": correlation_id}
         )
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_409_CONFLICT,
             content=create_error_response(
                 status_code=status.HTTP_409_CONFLICT,
@@ -201,14 +234,13 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
         )
     
     logger.error(
-        f"Database error: {str(exc)}",
-        extra={
-            "correlation_id": correlation_id,
-            "traceback": traceback.format_exc(),
-        }
+        "Database error: %s",
+        exc,
+        exc_info=exc,
+        extra={"correlation_id": correlation_id}
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content=create_error_response(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -224,16 +256,17 @@ async def general_exception_handler(request: Request, exc: Exception):
     correlation_id = get_correlation_id()
     
     logger.error(
-        f"Unhandled exception: {str(exc)}",
+        "Unhandled exception: %s",
+        exc,
+        exc_info=exc,
         extra={
             "correlation_id": correlation_id,
-            "traceback": traceback.format_exc(),
             "path": request.url.path,
             "method": request.method,
         }
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content=create_error_response(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
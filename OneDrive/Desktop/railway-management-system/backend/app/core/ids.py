@@ -0,0 +1,33 @@
+import secrets
+import string
+import time
+
+BOOKING_REFERENCE_ALPHABET = string.ascii_uppercase + string.digits
+BOOKING_REFERENCE_LENGTH = 8
+BOOKING_REFERENCE_SPACE = len(BOOKING_REFERENCE_ALPHABET) ** BOOKING_REFERENCE_LENGTH
+
+
+def uuid7_str() -> str:
+    """Generate a time-ordered UUIDv7 string (RFC 9562)."""
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = secrets.token_bytes(10)
+
+    # 48-bit ms timestamp, version 7 + 12 random bits, variant 10 + 62 random bits
+    raw = (
+        timestamp_ms.to_bytes(6, "big")
+        + bytes((0x70 | (rand[0] & 0x0F), rand[1], 0x80 | (rand[2] & 0x3F)))
+        + rand[3:]
+    )
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def booking_reference() -> str:
+    """Generate an 8-character uppercase alphanumeric booking reference."""
+    # One CSPRNG draw, written out in base 36 (uniform, no modulo bias)
+    value = secrets.randbelow(BOOKING_REFERENCE_SPACE)
+    chars = []
+    for _ in range(BOOKING_REFERENCE_LENGTH):
+        value, index = divmod(value, len(BOOKING_REFERENCE_ALPHABET))
+        chars.append(BOOKING_REFERENCE_ALPHABET[index])
+    return ''.join(chars)
@@ -1,21 +1,70 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional, Union
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import jwt
+from jwt import InvalidTokenError as JWTError
 from fastapi import HTTPException, status
 from app.core.config import settings
 import hashlib
+import hmac
 import secrets
+import time
+
+# Password hashing - scrypt with its cost parameters stored alongside the hash,
+# as "scrypt$<n>$<r>$<p>$<salt hex>$<digest hex>", so they can be raised later
+PASSWORD_HASH_SCHEME = "scrypt"
+PASSWORD_SALT_BYTES = 16
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+# Salted BLAKE2b hashes written before the move to scrypt
+LEGACY_BLAKE2B_SCHEME = "blake2b"
+_sha256 = hashlib.sha256
+
+
+def _scrypt_password_digest(password: str, salt: bytes, n: int, r: int, p: int) -> str:
+    # Allow twice the 128 * n * r bytes scrypt needs so raised costs still fit
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024, dklen=SCRYPT_DKLEN
+    ).hex()
+
 
-# Password hashing - using SHA256 for simplicity
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash."""
-    return hashlib.sha256(plain_password.encode()).hexdigest() == hashed_password
+    parts = hashed_password.split("$")
+    try:
+        if parts[0] == PASSWORD_HASH_SCHEME:
+            if len(parts) != 6:
+                return False
+            _, n, r, p, salt_hex, digest = parts
+            return hmac.compare_digest(
+                _scrypt_password_digest(plain_password, bytes.fromhex(salt_hex), int(n), int(r), int(p)), digest
+            )
+        if parts[0] == LEGACY_BLAKE2B_SCHEME:
+            if len(parts) != 3:
+                return False
+            _, salt_hex, digest = parts
+            return hmac.compare_digest(
+                hashlib.blake2b(plain_password.encode(), salt=bytes.fromhex(salt_hex)).hexdigest(), digest
+            )
+    except (ValueError, TypeError):
+        # Corrupt stored hash (bad hex or cost, oversized salt, non-ASCII digest)
+        return False
+    
+    # Legacy unsalted SHA256 hashes
+    return hmac.compare_digest(_sha256(plain_password.encode()).hexdigest(), hashed_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash uses a legacy scheme or older scrypt costs than the current ones."""
+    return not hashed_password.startswith(f"{PASSWORD_HASH_SCHEME}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
 
 
 def get_password_hash(password: str) -> str:
-    """Hash password using SHA256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password using salted scrypt."""
+    salt = secrets.token_bytes(PASSWORD_SALT_BYTES)
+    digest = _scrypt_password_digest(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"{PASSWORD_HASH_SCHEME}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${digest}"
 
 
 def create_access_token(
@@ -24,16 +73,16 @@ def create_access_token(
     additional_claims: Optional[dict] = None
 ) -> str:
     """Create JWT access token."""
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    # Numeric dates (RFC 7519) avoid datetime construction and conversion
+    now = int(time.time())
+    if not expires_delta:
+        expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {
-        "exp": expire,
+        "exp": now + int(expires_delta.total_seconds()),
         "sub": str(subject),
         "type": "access",
-        "iat": datetime.utcnow(),
+        "iat": now,
     }
     
     if additional_claims:
@@ -65,8 +114,10 @@ def verify_token(token: str, token_type: str = "access") -> dict:
 class RoleChecker:
     """Role-based access control."""
     
+    __slots__ = ("allowed_roles",)
+    
     def __init__(self, allowed_roles: list[str]):
-        self.allowed_roles = allowed_roles
+        self.allowed_roles = frozenset(allowed_roles)
     
     def __call__(self, user_role: str) -> bool:
         return user_role in self.allowed_roles
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Date, Time, Enum, ForeignKey, Text, DECIMAL
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Date, Time, Enum, ForeignKey, Text, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
 
+# Store enums as short VARCHARs validated in Python rather than native DB enum types
+ENUM_KWARGS = dict(native_enum=False, length=20, validate_strings=True)
+
 class UserRole(str, enum.Enum):
     admin = "admin"
     user = "user"
@@ -44,7 +47,7 @@ class User(Base):
     password_hash = Column(String(255), nullable=False)
     full_name = Column(String(255), nullable=False)
     phone = Column(String(20))
-    role = Column(Enum(UserRole), default=UserRole.user)
+    role = Column(Enum(UserRole, **ENUM_KWARGS), default=UserRole.user)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -54,7 +57,6 @@ class User(Base):
     credit_cards = relationship("CreditCard", back_populates="user")
     wallet = relationship("Wallet", back_populates="user", uselist=False)
     upi_ids = relationship("UpiId", back_populates="user")
-    upi_ids = relationship("UpiId", back_populates="user")
 
 class Station(Base):
     __tablename__ = "stations"
@@ -65,6 +67,9 @@ class Station(Base):
     city = Column(String(255), nullable=False)
     state = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Fetch created_at during the INSERT flush so a new row needs no reload
+    __mapper_args__ = {"eager_defaults": True}
 
 class Train(Base):
     __tablename__ = "trains"
@@ -72,12 +77,18 @@ class Train(Base):
     id = Column(Integer, primary_key=True, index=True)
     number = Column(String(10), unique=True, nullable=False)
     name = Column(String(255), nullable=False)
-    type = Column(Enum(TrainType), nullable=False)
+    type = Column(Enum(TrainType, **ENUM_KWARGS), nullable=False)
     total_seats = Column(Integer, nullable=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     routes = relationship("Route", back_populates="train")
+    
+    __table_args__ = (
+        Index("idx_trains_active", "is_active"),
+    )
+    
+    __mapper_args__ = {"eager_defaults": True}
 
 class Route(Base):
     __tablename__ = "routes"
@@ -97,6 +108,10 @@ class Route(Base):
     source_station = relationship("Station", foreign_keys=[source_station_id])
     destination_station = relationship("Station", foreign_keys=[destination_station_id])
     schedules = relationship("TrainSchedule", back_populates="route")
+    
+    __table_args__ = (
+        Index("idx_routes_src_dst_active", "source_station_id", "destination_station_id", "is_active"),
+    )
 
 class TrainSchedule(Base):
     __tablename__ = "train_schedules"
@@ -105,11 +120,16 @@ class TrainSchedule(Base):
     route_id = Column(Integer, ForeignKey("routes.id"), nullable=False)
     schedule_date = Column(Date, nullable=False)
     available_seats = Column(Integer, nullable=False)
-    status = Column(Enum(ScheduleStatus), default=ScheduleStatus.scheduled)
+    status = Column(Enum(ScheduleStatus, **ENUM_KWARGS), default=ScheduleStatus.scheduled)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     route = relationship("Route", back_populates="schedules")
     bookings = relationship("Booking", back_populates="schedule")
+    
+    __table_args__ = (
+        Index("idx_schedules_date_seats", "schedule_date", "available_seats"),
+        Index("idx_schedules_route_date_status", "route_id", "schedule_date", "status"),
+    )
 
 class Booking(Base):
     __tablename__ = "bookings"
@@ -120,7 +140,7 @@ class Booking(Base):
     booking_reference = Column(String(20), unique=True, nullable=False)
     passenger_count = Column(Integer, nullable=False)
     total_amount = Column(DECIMAL(10, 2), nullable=False)
-    status = Column(Enum(BookingStatus), default=BookingStatus.confirmed)
+    status = Column(Enum(BookingStatus, **ENUM_KWARGS), default=BookingStatus.confirmed)
     booking_date = Column(DateTime(timezone=True), server_default=func.now())
     journey_date_from = Column(Date, nullable=False)
     journey_date_to = Column(Date, nullable=False)    
@@ -128,6 +148,12 @@ class Booking(Base):
     schedule = relationship("TrainSchedule", back_populates="bookings")
     passengers = relationship("Passenger", back_populates="booking", cascade="all, delete-orphan")
     payment = relationship("Payment", back_populates="booking", uselist=False)
+    
+    __table_args__ = (
+        Index("idx_bookings_booking_date", "booking_date"),
+        Index("idx_bookings_user_status", "user_id", "status"),
+        Index("idx_bookings_user_booking_date", "user_id", "booking_date"),
+    )
 
 class Passenger(Base):
     __tablename__ = "passengers"
@@ -136,7 +162,7 @@ class Passenger(Base):
     booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False)
     name = Column(String(255), nullable=False)
     age = Column(Integer, nullable=False)
-    gender = Column(Enum(Gender), nullable=False)
+    gender = Column(Enum(Gender, **ENUM_KWARGS), nullable=False)
     seat_number = Column(String(10))
     
     booking = relationship("Booking", back_populates="passengers")
@@ -145,13 +171,18 @@ class SystemAlert(Base):
     __tablename__ = "system_alerts"
     
     id = Column(Integer, primary_key=True, index=True)
-    alert_type = Column(Enum(AlertType), nullable=False)
+    alert_type = Column(Enum(AlertType, **ENUM_KWARGS), nullable=False)
     title = Column(String(255), nullable=False)
     message = Column(Text, nullable=False)
     icon = Column(String(50), default="info-circle")
     dismissible = Column(Boolean, default=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("idx_system_alerts_title_active_created", "title", "is_active", "created_at"),
+    )
 
 class RefundStatus(str, enum.Enum):
     PENDING = "pending"
@@ -165,7 +196,7 @@ class RefundRequest(Base):
     booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     amount = Column(DECIMAL(10, 2), nullable=False)
-    status = Column(Enum(RefundStatus, values_callable=lambda x: [e.value for e in x]), default=RefundStatus.PENDING)
+    status = Column(Enum(RefundStatus, values_callable=lambda x: [e.value for e in x], **ENUM_KWARGS), default=RefundStatus.PENDING)
     requested_at = Column(DateTime(timezone=True), server_default=func.now())
     approved_at = Column(DateTime(timezone=True), nullable=True)
     admin_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -174,4 +205,8 @@ class RefundRequest(Base):
     booking = relationship("Booking")
     user = relationship("User", foreign_keys=[user_id])
     admin = relationship("User", foreign_keys=[admin_id])
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("idx_refund_requests_status_user", "status", "user_id"),
+    )
\ No newline at end of file
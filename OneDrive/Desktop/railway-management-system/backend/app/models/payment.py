@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Date, Time, Enum, ForeignKey, Text, DECIMAL
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Date, Time, Enum, ForeignKey, Text, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.models import ENUM_KWARGS
 import enum
 
 class PaymentStatus(str, enum.Enum):
@@ -35,6 +36,10 @@ class CreditCard(Base):
     # Relationship
     user = relationship("User", back_populates="credit_cards")
     transactions = relationship("CardTransaction", back_populates="card")
+    
+    __table_args__ = (
+        Index("idx_credit_cards_user_active", "user_id", "is_active"),
+    )
 
 class Wallet(Base):
     __tablename__ = "wallets"
@@ -63,6 +68,10 @@ class WalletTransaction(Base):
     
     # Relationship
     wallet = relationship("Wallet", back_populates="transactions")
+    
+    __table_args__ = (
+        Index("idx_wallet_transactions_wallet_created", "wallet_id", "created_at"),
+    )
 
 class UpiId(Base):
     __tablename__ = "upi_ids"
@@ -77,6 +86,10 @@ class UpiId(Base):
     # Relationship
     user = relationship("User", back_populates="upi_ids")
     transactions = relationship("UpiTransaction", back_populates="upi")
+    
+    __table_args__ = (
+        Index("idx_upi_ids_user_active", "user_id", "is_active"),
+    )
 
 class CardTransaction(Base):
     __tablename__ = "card_transactions"
@@ -91,6 +104,10 @@ class CardTransaction(Base):
     
     # Relationship
     card = relationship("CreditCard", back_populates="transactions")
+    
+    __table_args__ = (
+        Index("idx_card_transactions_card_created", "card_id", "created_at"),
+    )
 
 class UpiTransaction(Base):
     __tablename__ = "upi_transactions"
@@ -105,16 +122,20 @@ class UpiTransaction(Base):
     
     # Relationship
     upi = relationship("UpiId", back_populates="transactions")
+    
+    __table_args__ = (
+        Index("idx_upi_transactions_upi_created", "upi_id", "created_at"),
+    )
 
 class Payment(Base):
     __tablename__ = "payments"
     
     id = Column(Integer, primary_key=True, index=True)
-    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False, unique=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     amount = Column(DECIMAL(10, 2), nullable=False)
-    payment_method = Column(Enum(PaymentMethod), nullable=False)
-    status = Column(Enum(PaymentStatus), nullable=False, default=PaymentStatus.pending)
+    payment_method = Column(Enum(PaymentMethod, **ENUM_KWARGS), nullable=False)
+    status = Column(Enum(PaymentStatus, **ENUM_KWARGS), nullable=False, default=PaymentStatus.pending)
     transaction_id = Column(String(100), unique=True)
     gateway_response = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -122,4 +143,8 @@ class Payment(Base):
     
     # Relationships
     booking = relationship("Booking", back_populates="payment")
-    user = relationship("User", back_populates="payments")
\ No newline at end of file
+    user = relationship("User", back_populates="payments")
+    
+    __table_args__ = (
+        Index("idx_payments_user_created", "user_id", "created_at"),
+    )
\ No newline at end of file
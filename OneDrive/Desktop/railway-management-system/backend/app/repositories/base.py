@@ -1,7 +1,8 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import and_, inspect, literal, select, update, delete, func
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from pydantic import BaseModel
 from app.core.database import Base
 
@@ -15,6 +16,15 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     
     def __init__(self, model: Type[ModelType]):
         self.model = model
+        # Resolve filterable columns once instead of reflecting on every query
+        self._columns = {key: getattr(model, key) for key in inspect(model).columns.keys()}
+    
+    def _filter_clauses(self, filters: Optional[Dict[str, Any]]) -> List:
+        """Build equality clauses for filters that name a mapped column."""
+        if not filters:
+            return []
+        columns = self._columns
+        return [columns[key] == value for key, value in filters.items() if key in columns]
     
     async def get(
         self, 
@@ -44,10 +54,9 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """Get multiple records with pagination and filtering."""
         query = select(self.model)
         
-        if filters:
-            for key, value in filters.items():
-                if hasattr(self.model, key):
-                    query = query.where(getattr(self.model, key) == value)
+        clauses = self._filter_clauses(filters)
+        if clauses:
+            query = query.where(and_(*clauses))
         
         if options:
             query = query.options(*options)
@@ -60,6 +69,40 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db.execute(query)
         return result.scalars().all()
     
+    async def get_multi_with_count(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[Dict[str, Any]] = None,
+        options: Optional[List] = None,
+        order_by: Optional[Any] = None,
+    ) -> Tuple[List[ModelType], int]:
+        """Get a page of records together with the total match count in one query."""
+        query = select(self.model, func.count().over().label("total"))
+        
+        clauses = self._filter_clauses(filters)
+        if clauses:
+            query = query.where(and_(*clauses))
+        
+        if options:
+            query = query.options(*options)
+        
+        if order_by is not None:
+            query = query.order_by(order_by)
+        
+        query = query.offset(skip).limit(limit)
+        
+        result = await db.execute(query)
+        rows = result.all()
+        if not rows:
+            # A page past the end carries no window total, so count separately
+            total = await self.count(db, filters=filters) if skip else 0
+            return [], total
+        
+        return [row[0] for row in rows], rows[0].total
+    
     async def create(
         self, 
         db: AsyncSession, 
@@ -68,14 +111,17 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         commit: bool = True
     ) -> ModelType:
         """Create a new record."""
-        obj_data = obj_in.dict() if hasattr(obj_in, 'dict') else obj_in
+        obj_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump()
         db_obj = self.model(**obj_data)
         
         db.add(db_obj)
         
         if commit:
             await db.commit()
-            await db.refresh(db_obj)
+            # Sessions keep attributes after commit and server defaults already came
+            # back through INSERT ... RETURNING; only reload where that is unavailable
+            if not db.get_bind().dialect.insert_returning:
+                await db.refresh(db_obj)
         
         return db_obj
     
@@ -85,10 +131,32 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         *,
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]],
-        commit: bool = True
+        commit: bool = True,
+        use_core: bool = False
     ) -> ModelType:
-        """Update an existing record."""
-        obj_data = obj_in.dict(exclude_unset=True) if hasattr(obj_in, 'dict') else obj_in
+        """Update an existing record.
+        
+        With use_core, a dict of column values is written with a single UPDATE
+        statement instead of going through the unit of work. Server-side defaults
+        such as updated_at are not reloaded on that path.
+        """
+        obj_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+        
+        if use_core and isinstance(obj_in, dict):
+            values = {key: value for key, value in obj_data.items() if key in self._columns}
+            if values:
+                await db.execute(
+                    update(self.model)
+                    .where(self.model.id == db_obj.id)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+                # Mirror the written values on the instance without marking it dirty
+                for key, value in values.items():
+                    set_committed_value(db_obj, key, value)
+            if commit:
+                await db.commit()
+            return db_obj
         
         for field, value in obj_data.items():
             if hasattr(db_obj, field):
@@ -108,6 +176,20 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         commit: bool = True
     ) -> Optional[ModelType]:
         """Delete a record by ID."""
+        # Delete in one round-trip when the backend supports RETURNING and no
+        # ORM cascade needs the loaded instance (MySQL falls through to get + delete)
+        if db.get_bind().dialect.delete_returning and not any(
+            rel.cascade.delete for rel in inspect(self.model).relationships
+        ):
+            stmt = delete(self.model).where(self.model.id == id).returning(self.model)
+            obj = (await db.execute(stmt)).scalar_one_or_none()
+            if obj is not None:
+                # The row is gone; detach so the instance keeps its loaded values
+                db.expunge(obj)
+                if commit:
+                    await db.commit()
+            return obj
+        
         obj = await self.get(db, id)
         if obj:
             await db.delete(obj)
@@ -124,10 +206,9 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """Count records with optional filtering."""
         query = select(func.count(self.model.id))
         
-        if filters:
-            for key, value in filters.items():
-                if hasattr(self.model, key):
-                    query = query.where(getattr(self.model, key) == value)
+        clauses = self._filter_clauses(filters)
+        if clauses:
+            query = query.where(and_(*clauses))
         
         result = await db.execute(query)
         return result.scalar()
@@ -139,12 +220,5 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         filters: Dict[str, Any]
     ) -> bool:
         """Check if record exists with given filters."""
-        query = select(self.model.id)
-        
-        for key, value in filters.items():
-            if hasattr(self.model, key):
-                query = query.where(getattr(self.model, key) == value)
-        
-        query = query.limit(1)
-        result = await db.execute(query)
-        return result.scalar_one_or_none() is not None
\ No newline at end of file
+        query = select(literal(1)).select_from(self.model).where(*self._filter_clauses(filters))
+        return bool(await db.scalar(select(query.exists())))
\ No newline at end of file
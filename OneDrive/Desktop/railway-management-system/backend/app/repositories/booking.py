@@ -1,19 +1,20 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, text
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, update, and_, func, lambda_stmt, text, tuple_
+from sqlalchemy.orm import joinedload, selectinload
 from app.repositories.base import BaseRepository
 from app.models.booking import Booking, Passenger
-from app.models.train import TrainSchedule
+from app.models.train import Route, TrainSchedule
 from app.schemas.booking import BookingCreate, BookingUpdate
 from app.core.exceptions import InsufficientSeatsError, NotFoundError
+from app.core.ids import booking_reference
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
-    """Repository for booking operations with seat locking."""
+    """Repository for booking operations with seat reservation."""
     
     def __init__(self):
         super().__init__(Booking)
@@ -25,26 +26,24 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
         booking_data: BookingCreate,
         user_id: int
     ) -> Booking:
-        """Create booking with pessimistic seat locking."""
+        """Create booking, reserving seats with an optimistic conditional update."""
+        passenger_count = len(booking_data.passengers)
         
-        # Start transaction with row-level locking
         async with db.begin():
-            # Lock the train schedule row for update
+            # Read seats and fare in one unlocked query
             schedule_query = (
-                select(TrainSchedule)
+                select(TrainSchedule.available_seats, Route.base_fare)
+                .join(Route, TrainSchedule.route_id == Route.id)
                 .where(TrainSchedule.id == booking_data.schedule_id)
-                .with_for_update()  # Pessimistic lock
             )
             
             result = await db.execute(schedule_query)
-            schedule = result.scalar_one_or_none()
+            schedule = result.first()
             
             if not schedule:
                 raise NotFoundError("TrainSchedule", booking_data.schedule_id)
             
-            passenger_count = len(booking_data.passengers)
-            
-            # Check seat availability under lock
+            # Fail fast on an already-full schedule
             if schedule.available_seats < passenger_count:
                 raise InsufficientSeatsError(
                     available=schedule.available_seats,
@@ -52,7 +51,7 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
                 )
             
             # Calculate total amount
-            total_amount = schedule.route.base_fare * passenger_count
+            total_amount = schedule.base_fare * passenger_count
             
             # Create booking
             booking = Booking(
@@ -67,33 +66,58 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
             db.add(booking)
             await db.flush()  # Get booking ID without committing
             
-            # Create passengers
-            for passenger_data in booking_data.passengers:
-                passenger = Passenger(
-                    booking_id=booking.id,
-                    name=passenger_data.name,
-                    age=passenger_data.age,
-                    gender=passenger_data.gender
+            # Create passengers in a single multi-row insert
+            await db.execute(insert(Passenger), [
+                {
+                    "booking_id": booking.id,
+                    "name": passenger_data.name,
+                    "age": passenger_data.age,
+                    "gender": passenger_data.gender
+                }
+                for passenger_data in booking_data.passengers
+            ])
+            
+            # Reserve the seats only if they are still free. This is the last write
+            # before commit, so the schedule row lock is held as briefly as possible.
+            result = await db.execute(
+                update(TrainSchedule)
+                .where(
+                    TrainSchedule.id == booking_data.schedule_id,
+                    TrainSchedule.available_seats >= passenger_count
                 )
-                db.add(passenger)
+                .values(available_seats=TrainSchedule.available_seats - passenger_count)
+                .execution_options(synchronize_session=False)
+            )
             
-            # Update available seats
-            schedule.available_seats -= passenger_count
+            if result.rowcount == 0:
+                # A concurrent booking took the seats after our read
+                available = await db.scalar(
+                    select(TrainSchedule.available_seats)
+                    .where(TrainSchedule.id == booking_data.schedule_id)
+                )
+                raise InsufficientSeatsError(
+                    available=available,
+                    requested=passenger_count
+                )
             
             # Log the booking operation
-            logger.info(
-                f"Booking created: {booking.booking_reference}",
-                extra={
-                    "booking_id": booking.id,
-                    "user_id": user_id,
-                    "schedule_id": booking_data.schedule_id,
-                    "passenger_count": passenger_count,
-                    "seats_remaining": schedule.available_seats
-                }
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Booking created: %s",
+                    booking.booking_reference,
+                    extra={
+                        "booking_id": booking.id,
+                        "user_id": user_id,
+                        "schedule_id": booking_data.schedule_id,
+                        "passenger_count": passenger_count,
+                        "seats_remaining": schedule.available_seats - passenger_count
+                    }
+                )
             
             await db.commit()
-            await db.refresh(booking)
+            # One refresh for the server-set booking_date and the relationships callers render;
+            # passengers were inserted through Core so the collection is not populated yet
+            await db.refresh(booking, ["booking_date", "schedule", "passengers"])
             
             return booking
     
@@ -110,7 +134,6 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
             # Get booking with lock
             booking_query = (
                 select(Booking)
-                .options(selectinload(Booking.schedule))
                 .where(
                     and_(
                         Booking.id == booking_id,
@@ -118,7 +141,9 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
                         Booking.status == "confirmed"
                     )
                 )
-                .with_for_update()
+                # Only status changes, so FOR NO KEY UPDATE on PostgreSQL leaves FK
+                # checks from passengers/payments unblocked (MySQL renders FOR UPDATE)
+                .with_for_update(key_share=True)
             )
             
             result = await db.execute(booking_query)
@@ -127,34 +152,31 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
             if not booking:
                 return None
             
-            # Lock the schedule for update
-            schedule_query = (
-                select(TrainSchedule)
-                .where(TrainSchedule.id == booking.schedule_id)
-                .with_for_update()
-            )
-            
-            result = await db.execute(schedule_query)
-            schedule = result.scalar_one()
-            
             # Update booking status
             booking.status = "cancelled"
             
-            # Release seats
-            schedule.available_seats += booking.passenger_count
-            
-            logger.info(
-                f"Booking cancelled: {booking.booking_reference}",
-                extra={
-                    "booking_id": booking.id,
-                    "user_id": user_id,
-                    "seats_released": booking.passenger_count,
-                    "seats_available": schedule.available_seats
-                }
+            # Release seats in a single atomic increment
+            await db.execute(
+                update(TrainSchedule)
+                .where(TrainSchedule.id == booking.schedule_id)
+                .values(available_seats=TrainSchedule.available_seats + booking.passenger_count)
+                .execution_options(synchronize_session=False)
             )
             
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Booking cancelled: %s",
+                    booking.booking_reference,
+                    extra={
+                        "booking_id": booking.id,
+                        "user_id": user_id,
+                        "schedule_id": booking.schedule_id,
+                        "seats_released": booking.passenger_count
+                    }
+                )
+            
+            # Every column of the cancelled booking is already current in the session
             await db.commit()
-            await db.refresh(booking)
             
             return booking
     
@@ -163,22 +185,45 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
         db: AsyncSession,
         *,
         user_id: int,
-        skip: int = 0,
+        before_id: Optional[int] = None,
         limit: int = 100
     ) -> List[Booking]:
-        """Get user bookings with related data."""
-        query = (
-            select(Booking)
+        """Get user bookings with related data, newest first.
+        
+        Pass the id of the last booking of the previous page as before_id to get
+        the next page.
+        """
+        # lambda_stmt caches the built statement; user_id/limit become bound parameters
+        query = lambda_stmt(
+            lambda: select(Booking)
             .options(
-                selectinload(Booking.schedule).selectinload(TrainSchedule.route),
+                # The Booking schema renders the full route, so eager load it with its
+                # train and stations to avoid lazy loads (which fail under AsyncSession)
+                selectinload(Booking.schedule)
+                .load_only(TrainSchedule.route_id, TrainSchedule.schedule_date, TrainSchedule.available_seats)
+                .selectinload(TrainSchedule.route)
+                .options(
+                    joinedload(Route.train),
+                    joinedload(Route.source_station),
+                    joinedload(Route.destination_station)
+                ),
                 selectinload(Booking.passengers)
+                .load_only(Passenger.name, Passenger.age, Passenger.gender, Passenger.seat_number)
             )
             .where(Booking.user_id == user_id)
-            .order_by(Booking.booking_date.desc())
-            .offset(skip)
+            .order_by(Booking.booking_date.desc(), Booking.id.desc())
             .limit(limit)
         )
         
+        if before_id is not None:
+            # Keyset on (booking_date, id) so deep pages stay an index range scan
+            query += lambda s: s.where(
+                tuple_(Booking.booking_date, Booking.id) < tuple_(
+                    select(Booking.booking_date).where(Booking.id == before_id).scalar_subquery(),
+                    before_id
+                )
+            )
+        
         result = await db.execute(query)
         return result.scalars().all()
     
@@ -189,12 +234,15 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
         booking_reference: str
     ) -> Optional[Booking]:
         """Get booking by reference number."""
-        query = (
-            select(Booking)
+        query = lambda_stmt(
+            lambda: select(Booking)
             .options(
-                selectinload(Booking.schedule).selectinload(TrainSchedule.route),
-                selectinload(Booking.passengers),
-                selectinload(Booking.user)
+                # Many-to-one chains ride along in the main SELECT; only passengers need a second query
+                joinedload(Booking.schedule).joinedload(TrainSchedule.route).joinedload(Route.train),
+                joinedload(Booking.schedule).joinedload(TrainSchedule.route).joinedload(Route.source_station),
+                joinedload(Booking.schedule).joinedload(TrainSchedule.route).joinedload(Route.destination_station),
+                joinedload(Booking.user),
+                selectinload(Booking.passengers)
             )
             .where(Booking.booking_reference == booking_reference)
         )
@@ -210,31 +258,31 @@ class BookingRepository(BaseRepository[Booking, BookingCreate, BookingUpdate]):
         end_date: Optional[str] = None
     ) -> dict:
         """Get revenue statistics."""
-        query = select(
-            func.count(Booking.id).label("total_bookings"),
-            func.sum(Booking.total_amount).label("total_revenue"),
-            func.sum(Booking.passenger_count).label("total_passengers")
-        ).where(Booking.status == "confirmed")
+        query = lambda_stmt(
+            lambda: select(
+                func.count(Booking.id).label("total_bookings"),
+                func.sum(Booking.total_amount).label("total_revenue"),
+                func.sum(Booking.passenger_count).label("total_passengers")
+            ).where(Booking.status == "confirmed")
+        )
         
         if start_date:
-            query = query.where(Booking.booking_date >= start_date)
+            query += lambda s: s.where(Booking.booking_date >= start_date)
         if end_date:
-            query = query.where(Booking.booking_date <= end_date)
+            query += lambda s: s.where(Booking.booking_date <= end_date)
         
         result = await db.execute(query)
         stats = result.first()
         
         return {
-            "total_bookings": stats.total_bookings or 0,
+            "total_bookings": int(stats.total_bookings or 0),
             "total_revenue": float(stats.total_revenue or 0),
-            "total_passengers": stats.total_passengers or 0
+            "total_passengers": int(stats.total_passengers or 0)
         }
     
     def _generate_booking_reference(self) -> str:
         """Generate unique booking reference."""
-        import secrets
-        import string
-        return ''.join(secrets.choices(string.ascii_uppercase + string.digits, k=8))
+        return booking_reference()
 
 
 # Repository instance
@@ -1,9 +1,9 @@
-from pydantic import BaseModel, EmailStr, ConfigDict, Field, validator
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, TypeAdapter, field_validator
+from typing import Optional, List, Type, TypeVar
 from datetime import datetime, date, time
 from decimal import Decimal
 from enum import Enum
-import re
+import string
 
 class UserRole(str, Enum):
     admin = "admin"
@@ -32,19 +32,13 @@ class UserBase(BaseModel):
     phone: Optional[str] = None
 
 class UserCreate(UserBase):
+    # Length and phone format are enforced by pydantic-core constraints
+    phone: Optional[str] = Field(None, pattern=r'^[0-9]{10}$')
     password: str = Field(..., min_length=8)
     
-    @validator('phone')
-    def validate_phone(cls, v):
-        if v and (len(v) != 10 or not v.isdigit()):
-            raise ValueError('Phone number must be exactly 10 digits')
-        return v
-    
-    @validator('password')
+    @field_validator('password')
+    @classmethod
     def validate_password(cls, v):
-        if len(v) < 8:
-            raise ValueError('Password must be at least 8 characters long')
-        
         # Check password strength
         strength = get_password_strength(v)
         if strength == 'weak':
@@ -52,6 +46,13 @@ class UserCreate(UserBase):
         
         return v
 
+PASSWORD_CHARACTER_CLASSES = (
+    frozenset(string.ascii_lowercase),
+    frozenset(string.ascii_uppercase),
+    frozenset(string.digits),
+    frozenset('!@#$%^&*(),.?":{}|<>'),
+)
+
 def get_password_strength(password: str) -> str:
     """Calculate password strength"""
     score = 0
@@ -62,15 +63,11 @@ def get_password_strength(password: str) -> str:
     if len(password) >= 12:
         score += 1
     
-    # Character variety checks
-    if re.search(r'[a-z]', password):
-        score += 1
-    if re.search(r'[A-Z]', password):
-        score += 1
-    if re.search(r'[0-9]', password):
-        score += 1
-    if re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-        score += 1
+    # Character variety checks, classifying the password's characters in one pass
+    chars = set(password)
+    for char_class in PASSWORD_CHARACTER_CLASSES:
+        if not chars.isdisjoint(char_class):
+            score += 1
     
     if score <= 2:
         return 'weak'
@@ -215,6 +212,9 @@ class TrainScheduleResponse(BaseModel):
 # Update forward references
 Booking.model_rebuild()
 
+# Prebuilt validator/serializer for booking list responses
+BOOKING_LIST_ADAPTER = TypeAdapter(List[Booking])
+
 class RefundStatus(str, Enum):
     PENDING = "pending"
     APPROVED = "approved"
@@ -247,4 +247,10 @@ RefundRequest.model_rebuild()
 
 class RefundRequestUpdate(BaseModel):
     status: RefundStatus
-    rejection_reason: Optional[str] = None
\ No newline at end of file
+    rejection_reason: Optional[str] = None
+
+SchemaType = TypeVar("SchemaType", bound=BaseModel)
+
+def orm_response(schema: Type[SchemaType], obj) -> SchemaType:
+    """Build a flat response schema from a trusted ORM object without re-validating it"""
+    return schema.model_construct(**{field: getattr(obj, field) for field in schema.model_fields})
\ No newline at end of file
@@ -18,6 +18,8 @@ class PaymentStatusEnum(str, Enum):
     refunded = "refunded"
 
 # Credit Card Schemas
+MASKED_CARD_PREFIX = "**** **** **** "
+
 class CreditCardCreate(BaseModel):
     card_number: str = Field(..., min_length=13, max_length=19)
     cardholder_name: str = Field(..., min_length=1, max_length=100)
@@ -25,6 +27,11 @@ class CreditCardCreate(BaseModel):
     expiry_year: int = Field(..., ge=2024, le=2050)
     cvv: str = Field(..., min_length=3, max_length=4)
     card_type: str = Field(..., min_length=1, max_length=20)
+    
+    @property
+    def masked_number(self) -> str:
+        """Card number as stored: only the last four digits are kept"""
+        return MASKED_CARD_PREFIX + self.card_number[-4:]
 
 class CreditCard(BaseModel):
     id: int
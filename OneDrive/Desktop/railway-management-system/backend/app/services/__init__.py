@@ -1,12 +1,25 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, text
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
+from sqlalchemy import and_, or_, bindparam, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from app.models import User, Station, Train, Route, TrainSchedule, Booking, Passenger
 from app.schemas import UserCreate, StationCreate, TrainCreate, RouteCreate, BookingCreate, TrainSearchRequest
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, password_needs_rehash, verify_password
+from app.core.ids import booking_reference
 from datetime import datetime, timedelta
 from typing import List, Optional
-import random
-import string
+
+# Hot single-row lookups, built once so every call reuses the cached compiled form
+USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+STATION_BY_ID = select(Station).where(Station.id == bindparam("station_id"))
+TRAIN_BY_ID = select(Train).where(Train.id == bindparam("train_id"))
+ROUTE_BY_ID = select(Route).where(Route.id == bindparam("route_id"))
+
+def commit_detached(db: Session, obj):
+    """Flush and commit obj, returning it detached with its flushed values instead of reloading it"""
+    db.flush()
+    db.expunge(obj)
+    db.commit()
+    return obj
 
 class UserService:
     @staticmethod
@@ -26,23 +39,30 @@ class UserService:
     
     @staticmethod
     def authenticate_user(db: Session, username: str, password: str):
-        user = db.query(User).filter(User.username == username).first()
+        user = db.execute(USER_BY_USERNAME, {"username": username}).scalar_one_or_none()
         if not user or not verify_password(password, user.password_hash):
             return False
+        
+        # Upgrade legacy and lower-cost hashes while the plain password is at hand
+        if password_needs_rehash(user.password_hash):
+            user.password_hash = get_password_hash(password)
+            db.commit()
         return user
     
     @staticmethod
     def get_user_by_username(db: Session, username: str):
-        return db.query(User).filter(User.username == username).first()
+        return db.execute(USER_BY_USERNAME, {"username": username}).scalar_one_or_none()
+    
+    @staticmethod
+    def username_exists(db: Session, username: str) -> bool:
+        return db.query(db.query(User).filter(User.username == username).exists()).scalar()
 
 class StationService:
     @staticmethod
     def create_station(db: Session, station: StationCreate):
-        db_station = Station(**station.dict())
+        db_station = Station(**station.model_dump())
         db.add(db_station)
-        db.commit()
-        db.refresh(db_station)
-        return db_station
+        return commit_detached(db, db_station)
     
     @staticmethod
     def get_all_stations(db: Session):
@@ -50,21 +70,19 @@ class StationService:
     
     @staticmethod
     def get_station_by_id(db: Session, station_id: int):
-        return db.query(Station).filter(Station.id == station_id).first()
+        return db.execute(STATION_BY_ID, {"station_id": station_id}).scalar_one_or_none()
 
 class TrainService:
     @staticmethod
     def create_train(db: Session, train: TrainCreate):
-        # Check if train number already exists
-        existing_train = db.query(Train).filter(Train.number == train.number).first()
-        if existing_train:
-            raise ValueError(f"Train number {train.number} already exists")
-        
-        db_train = Train(**train.dict())
+        db_train = Train(**train.model_dump())
         db.add(db_train)
-        db.commit()
-        db.refresh(db_train)
-        return db_train
+        try:
+            return commit_detached(db, db_train)
+        except IntegrityError:
+            # Train numbers are unique, so the INSERT itself rejects a duplicate
+            db.rollback()
+            raise ValueError(f"Train number {train.number} already exists")
     
     @staticmethod
     def get_all_trains(db: Session):
@@ -72,46 +90,46 @@ class TrainService:
     
     @staticmethod
     def get_train(db: Session, train_id: int):
-        return db.query(Train).filter(Train.id == train_id).first()
+        return db.execute(TRAIN_BY_ID, {"train_id": train_id}).scalar_one_or_none()
     
     @staticmethod
     def update_train(db: Session, train_id: int, train_data: TrainCreate):
         db_train = db.query(Train).filter(Train.id == train_id).first()
         if not db_train:
             return None
-        for key, value in train_data.dict().items():
+        for key, value in train_data.model_dump().items():
             setattr(db_train, key, value)
-        db.commit()
-        db.refresh(db_train)
-        return db_train
+        return commit_detached(db, db_train)
     
     @staticmethod
     def toggle_train_status(db: Session, train_id: int):
-        db_train = db.query(Train).filter(Train.id == train_id).first()
-        if not db_train:
+        # Toggle train status in the database without loading the train
+        toggled = db.query(Train).filter(Train.id == train_id).update(
+            {Train.is_active: ~Train.is_active}, synchronize_session=False
+        )
+        if not toggled:
             return None
-        
-        # Toggle train status
-        db_train.is_active = not db_train.is_active
+        is_active = db.query(Train.is_active).filter(Train.id == train_id).scalar()
         
         # Also toggle all routes associated with this train
         db.query(Route).filter(Route.train_id == train_id).update(
-            {Route.is_active: db_train.is_active}
+            {Route.is_active: is_active}, synchronize_session=False
         )
         
         db.commit()
-        db.refresh(db_train)
         
-        status = "activated" if db_train.is_active else "deactivated"
-        return {"message": f"Train and its routes {status} successfully", "is_active": db_train.is_active}
+        status = "activated" if is_active else "deactivated"
+        return {"message": f"Train and its routes {status} successfully", "is_active": is_active}
     
     @staticmethod
     def sync_routes_with_trains(db: Session):
         """Sync all routes status with their associated trains"""
-        # Update all routes to match their train's active status
-        db.execute(
-            text("UPDATE routes SET is_active = (SELECT is_active FROM trains WHERE trains.id = routes.train_id)")
-        )
+        # Update all routes to match their train's active status with one joined UPDATE
+        # (UPDATE ... FROM, or the multi-table UPDATE on MySQL), skipping routes already in sync
+        db.query(Route).filter(
+            Route.train_id == Train.id,
+            Route.is_active.is_distinct_from(Train.is_active)
+        ).update({Route.is_active: Train.is_active}, synchronize_session=False)
         db.commit()
         return {"message": "All routes synced with their train status"}
     
@@ -127,24 +145,44 @@ class TrainService:
     
     @staticmethod
     def get_admin_dashboard(db: Session):
-        total_trains = db.query(Train).filter(Train.is_active == True).count()
-        total_bookings = db.query(Booking).count()
-        total_revenue = db.query(Booking).filter(Booking.status == 'confirmed').with_entities(func.sum(Booking.total_amount)).scalar() or 0
-        active_users = db.query(User).filter(User.is_active == True).count()
+        # Gather all dashboard totals in a single round trip
+        totals = db.query(
+            db.query(func.count(Train.id))
+            .filter(Train.is_active == True)
+            .scalar_subquery()
+            .label("total_trains"),
+            db.query(func.count(Booking.id))
+            .scalar_subquery()
+            .label("total_bookings"),
+            db.query(func.coalesce(func.sum(Booking.total_amount), 0))
+            .filter(Booking.status == 'confirmed')
+            .scalar_subquery()
+            .label("total_revenue"),
+            db.query(func.count(User.id))
+            .filter(User.is_active == True)
+            .scalar_subquery()
+            .label("active_users"),
+        ).one()
         
         recent_bookings = db.query(Booking).order_by(Booking.booking_date.desc()).limit(10).all()
         
         return {
-            "total_trains": total_trains,
-            "total_bookings": total_bookings,
-            "total_revenue": float(total_revenue),
-            "active_users": active_users,
+            "total_trains": totals.total_trains,
+            "total_bookings": totals.total_bookings,
+            "total_revenue": float(totals.total_revenue),
+            "active_users": totals.active_users,
             "recent_bookings": recent_bookings
         }
     
     @staticmethod
     def search_trains(db: Session, search_request: TrainSearchRequest):
-        return db.query(TrainSchedule).join(Route).join(Train).filter(
+        # Populate route/train from the filter joins and load stations up front
+        route_loader = contains_eager(TrainSchedule.route)
+        return db.query(TrainSchedule).join(Route).join(Train).options(
+            route_loader.contains_eager(Route.train),
+            route_loader.joinedload(Route.source_station),
+            route_loader.joinedload(Route.destination_station)
+        ).filter(
             and_(
                 Route.source_station_id == search_request.source_station_id,
                 Route.destination_station_id == search_request.destination_station_id,
@@ -168,11 +206,11 @@ class RouteService:
             Route.source_station_id == route.source_station_id,
             Route.destination_station_id == route.destination_station_id,
             Route.is_active == True
-        ).first()
-        if existing_route:
+        ).exists()
+        if db.query(existing_route).scalar():
             raise ValueError("Route already exists for this train and stations")
         
-        db_route = Route(**route.dict())
+        db_route = Route(**route.model_dump())
         db.add(db_route)
         db.commit()
         db.refresh(db_route)
@@ -185,31 +223,38 @@ class RouteService:
     @staticmethod
     def create_schedules_for_route(db: Session, route_id: int, days_ahead: int = 30):
         """Create train schedules for a route for the next N days"""
-        from datetime import date, timedelta
+        RouteService.create_schedules_for_routes(db, [route_id], days_ahead)
+    
+    @staticmethod
+    def create_schedules_for_routes(db: Session, route_ids: List[int], days_ahead: int = 30):
+        """Create missing train schedules for several routes in one batched insert"""
+        from datetime import date
         
-        route = db.query(Route).filter(Route.id == route_id).first()
-        if not route:
+        if not route_ids or days_ahead <= 0:
             return
         
         today = date.today()
+        schedule_dates = [today + timedelta(days=i) for i in range(days_ahead)]
         
-        for i in range(days_ahead):
-            schedule_date = today + timedelta(days=i)
-            
-            # Check if schedule already exists
-            existing_schedule = db.query(TrainSchedule).filter(
-                TrainSchedule.route_id == route_id,
-                TrainSchedule.schedule_date == schedule_date
-            ).first()
-            
-            if not existing_schedule:
-                schedule = TrainSchedule(
-                    route_id=route_id,
-                    schedule_date=schedule_date,
-                    available_seats=route.train.total_seats
-                )
-                db.add(schedule)
+        route_seats = db.query(Route.id, Train.total_seats).join(Route.train).filter(
+            Route.id.in_(route_ids)
+        ).all()
         
+        # Skip dates that already have a schedule
+        existing = set(db.query(TrainSchedule.route_id, TrainSchedule.schedule_date).filter(
+            TrainSchedule.route_id.in_(route_ids),
+            TrainSchedule.schedule_date.between(schedule_dates[0], schedule_dates[-1])
+        ).all())
+        
+        rows = [
+            {"route_id": route_id, "schedule_date": schedule_date, "available_seats": total_seats}
+            for route_id, total_seats in route_seats
+            for schedule_date in schedule_dates
+            if (route_id, schedule_date) not in existing
+        ]
+        
+        if rows:
+            db.execute(insert(TrainSchedule), rows)
         db.commit()
     
     @staticmethod
@@ -218,14 +263,14 @@ class RouteService:
     
     @staticmethod
     def get_route(db: Session, route_id: int):
-        return db.query(Route).filter(Route.id == route_id).first()
+        return db.execute(ROUTE_BY_ID, {"route_id": route_id}).scalar_one_or_none()
     
     @staticmethod
     def update_route(db: Session, route_id: int, route_data: RouteCreate):
         db_route = db.query(Route).filter(Route.id == route_id).first()
         if not db_route:
             return None
-        for key, value in route_data.dict().items():
+        for key, value in route_data.model_dump().items():
             setattr(db_route, key, value)
         db.commit()
         db.refresh(db_route)
@@ -242,15 +287,33 @@ class RouteService:
         return {"message": "Route deleted successfully"}
 
 class BookingService:
+    @staticmethod
+    def booking_detail_options():
+        """Eager loads for everything the Booking response schema renders."""
+        # Schedules and passengers only load the columns the schema shows
+        schedule_loader = joinedload(Booking.schedule).load_only(
+            TrainSchedule.schedule_date, TrainSchedule.available_seats
+        )
+        route_loader = schedule_loader.joinedload(TrainSchedule.route)
+        return (
+            route_loader.joinedload(Route.train),
+            route_loader.joinedload(Route.source_station),
+            route_loader.joinedload(Route.destination_station),
+            selectinload(Booking.passengers).load_only(
+                Passenger.name, Passenger.age, Passenger.gender, Passenger.seat_number
+            )
+        )
+    
     @staticmethod
     def generate_booking_reference():
-        return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+        return booking_reference()
     
     @staticmethod
     def create_booking(db: Session, booking: BookingCreate, user_id: int):
-        from datetime import timedelta
-        # Check seat availability
-        schedule = db.query(TrainSchedule).filter(TrainSchedule.id == booking.schedule_id).first()
+        # Check seat availability (route is needed for fare and distance)
+        schedule = db.query(TrainSchedule).options(joinedload(TrainSchedule.route)).filter(
+            TrainSchedule.id == booking.schedule_id
+        ).first()
         if not schedule or schedule.available_seats < len(booking.passengers):
             raise ValueError("Insufficient seats available")
         
@@ -276,30 +339,46 @@ class BookingService:
         db.add(db_booking)
         db.flush()  # Get booking ID
         
-        # Add passengers
-        for passenger_data in booking.passengers:
-            passenger = Passenger(
-                booking_id=db_booking.id,
-                name=passenger_data.name,
-                age=passenger_data.age,
-                gender=passenger_data.gender
-            )
-            db.add(passenger)
-        
-        # Update available seats
-        schedule.available_seats -= len(booking.passengers)
+        # Add passengers in a single multi-row insert
+        db.execute(insert(Passenger), [
+            {
+                "booking_id": db_booking.id,
+                "name": passenger_data.name,
+                "age": passenger_data.age,
+                "gender": passenger_data.gender
+            }
+            for passenger_data in booking.passengers
+        ])
+        
+        # Reserve seats atomically so concurrent bookings cannot oversell
+        reserved = db.query(TrainSchedule).filter(
+            TrainSchedule.id == booking.schedule_id,
+            TrainSchedule.available_seats >= len(booking.passengers)
+        ).update(
+            {TrainSchedule.available_seats: TrainSchedule.available_seats - len(booking.passengers)},
+            synchronize_session=False
+        )
+        if not reserved:
+            db.rollback()
+            raise ValueError("Insufficient seats available")
         
+        booking_id = db_booking.id
         db.commit()
-        db.refresh(db_booking)
-        return db_booking
+        
+        # Reload the booking with its response graph in one round-trip plus passengers
+        return db.query(Booking).options(*BookingService.booking_detail_options()).filter(
+            Booking.id == booking_id
+        ).one()
     
     @staticmethod
     def get_user_bookings(db: Session, user_id: int):
-        return db.query(Booking).filter(Booking.user_id == user_id).all()
+        return db.query(Booking).options(*BookingService.booking_detail_options()).filter(
+            Booking.user_id == user_id
+        ).all()
     
     @staticmethod
     def get_booking_by_id(db: Session, booking_id: int, user_id: int):
-        return db.query(Booking).filter(
+        return db.query(Booking).options(*BookingService.booking_detail_options()).filter(
             and_(Booking.id == booking_id, Booking.user_id == user_id)
         ).first()
     
@@ -315,13 +394,22 @@ class BookingService:
         if booking.status != "confirmed":
             raise ValueError("Only confirmed bookings can be edited")
         
-        # Update passenger details
-        for i, passenger_data in enumerate(passengers_data):
-            if i < len(booking.passengers):
-                passenger = booking.passengers[i]
-                passenger.name = passenger_data['name']
-                passenger.age = passenger_data['age']
-                passenger.gender = passenger_data['gender']
+        # Update passenger details in one bulk UPDATE by primary key,
+        # without loading the passenger objects
+        passenger_ids = db.scalars(
+            select(Passenger.id).where(Passenger.booking_id == booking_id).order_by(Passenger.id)
+        ).all()
+        rows = [
+            {
+                "id": passenger_id,
+                "name": passenger_data['name'],
+                "age": passenger_data['age'],
+                "gender": passenger_data['gender']
+            }
+            for passenger_id, passenger_data in zip(passenger_ids, passengers_data)
+        ]
+        if rows:
+            db.execute(update(Passenger), rows)
         
         db.commit()
         return booking
@@ -344,8 +432,10 @@ class BookingService:
         booking.status = "cancelled"
         
         # Restore seats
-        schedule = db.query(TrainSchedule).filter(TrainSchedule.id == booking.schedule_id).first()
-        schedule.available_seats += booking.passenger_count
+        db.query(TrainSchedule).filter(TrainSchedule.id == booking.schedule_id).update(
+            {TrainSchedule.available_seats: TrainSchedule.available_seats + booking.passenger_count},
+            synchronize_session=False
+        )
         
         # Create refund request instead of immediate refund
         refund_request = RefundRequest(
@@ -361,16 +451,31 @@ class BookingService:
 
 class RefundService:
     @staticmethod
-    def get_pending_refund_requests(db: Session):
+    def get_pending_refund_requests(db: Session, batch_size: int = 200):
+        """Stream pending refund requests in batches, eager loading everything the RefundRequest schema renders
+
+        Rows are fetched lazily, so db must stay open until the result is consumed.
+        """
         from app.models import RefundRequest
-        return db.query(RefundRequest).filter(RefundRequest.status == "pending").all()
+        return db.execute(
+            select(RefundRequest)
+            .options(
+                joinedload(RefundRequest.booking).options(*BookingService.booking_detail_options()),
+                joinedload(RefundRequest.user),
+                joinedload(RefundRequest.admin)
+            )
+            .where(RefundRequest.status == "pending")
+            .execution_options(yield_per=batch_size)
+        ).scalars()
     
     @staticmethod
     def approve_refund_request(db: Session, request_id: int, admin_id: int):
         from app.models import RefundRequest, SystemAlert, AlertType
-        from datetime import datetime
         
-        refund_request = db.query(RefundRequest).filter(RefundRequest.id == request_id).first()
+        # The alert message needs the booking reference, so fetch it in the same query
+        refund_request = db.query(RefundRequest).options(
+            joinedload(RefundRequest.booking).load_only(Booking.booking_reference)
+        ).filter(RefundRequest.id == request_id).first()
         if not refund_request:
             raise ValueError("Refund request not found")
         
@@ -402,9 +507,11 @@ class RefundService:
     @staticmethod
     def reject_refund_request(db: Session, request_id: int, admin_id: int, reason: str = None):
         from app.models import RefundRequest
-        from datetime import datetime
         
-        refund_request = db.query(RefundRequest).filter(RefundRequest.id == request_id).first()
+        # The alert message needs the booking reference, so fetch it in the same query
+        refund_request = db.query(RefundRequest).options(
+            joinedload(RefundRequest.booking).load_only(Booking.booking_reference)
+        ).filter(RefundRequest.id == request_id).first()
         if not refund_request:
             raise ValueError("Refund request not found")
         
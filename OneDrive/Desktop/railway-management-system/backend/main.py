@@ -1,26 +1,39 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api import auth, stations, trains, routes, bookings, payments, admin
 from app.core.database import init_db
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Initialize database when the server starts rather than whenever this module is imported
+    init_db()
+    yield
+
 app = FastAPI(
     title="Railway Management System",
     description="A comprehensive railway booking and management system",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Initialize database
-init_db()
-
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000", "null"],  # Allow local development server and file access
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Explicit lists let preflight responses be static, and browsers cache them for max_age seconds
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type", "Accept"],
+    max_age=600,
 )
 
+# Compress larger responses such as transaction histories
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(stations.router)
@@ -1,16 +1,18 @@
 import pytest
 import asyncio
 from typing import AsyncGenerator, Generator
-from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.pool import StaticPool
 from app.main import app
-from app.core.database import get_db, Base
+from app.core.database import get_db, get_async_db, Base
 from app.core.config import settings
+from app.core.security import create_access_token
 import os
 
-# Test database URL (use SQLite for tests)
-TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+# Test database URL (in-memory SQLite, kept alive by the single StaticPool connection)
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 # Create test engine
 test_engine = create_async_engine(
@@ -20,17 +22,25 @@ test_engine = create_async_engine(
     echo=False,
 )
 
-# Create test session factory
-TestSessionLocal = async_sessionmaker(
-    test_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+
+# Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work with the sqlite driver
+@event.listens_for(test_engine.sync_engine, "connect")
+def _disable_driver_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(test_engine.sync_engine, "begin")
+def _begin_transaction(conn):
+    conn.exec_driver_sql("BEGIN")
 
 
 @pytest.fixture(scope="session")
 def event_loop() -> Generator:
-    """Create an instance of the default event loop for the test session."""
+    """Create an instance of the default event loop for the test session.
+    
+    pytest-asyncio 0.21 needs a session-scoped loop for session-scoped async
+    fixtures such as setup_database.
+    """
     loop = asyncio.get_event_loop_policy().new_event_loop()
     yield loop
     loop.close()
@@ -38,19 +48,26 @@ def event_loop() -> Generator:
 
 @pytest.fixture(scope="session")
 async def setup_database():
-    """Set up test database."""
+    """Create the schema once for the test session."""
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+    await test_engine.dispose()
 
 
 @pytest.fixture
 async def db_session(setup_database) -> AsyncGenerator[AsyncSession, None]:
-    """Create a test database session."""
-    async with TestSessionLocal() as session:
-        yield session
+    """Create a test database session whose changes are rolled back after the test."""
+    async with test_engine.connect() as conn:
+        await conn.begin()
+        # Commits inside the test release a SAVEPOINT; the outer transaction is never committed
+        async with AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        ) as session:
+            yield session
+        await conn.rollback()
 
 
 @pytest.fixture
@@ -60,16 +77,30 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     async def override_get_db():
         yield db_session
     
+    # Sync and async handlers share the rolled-back test session
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_db
     
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
     
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="session")
+def admin_access_token() -> str:
+    """Mint the admin token once; it only names the username, which every test recreates."""
+    return create_access_token(subject="testadmin")
+
+
+@pytest.fixture(scope="session")
+def user_access_token() -> str:
+    """Mint the regular user token once."""
+    return create_access_token(subject="testuser")
+
+
 @pytest.fixture
-async def admin_token(client: AsyncClient, db_session: AsyncSession) -> str:
+async def admin_token(db_session: AsyncSession, admin_access_token: str) -> str:
     """Create admin user and return auth token."""
     from app.services.auth import AuthService
     from app.schemas.user import UserCreate
@@ -85,15 +116,12 @@ async def admin_token(client: AsyncClient, db_session: AsyncSession) -> str:
     auth_service = AuthService()
     user = await auth_service.create_user(db_session, user_data, role="admin")
     
-    # Login and get token
-    login_data = {"username": "testadmin", "password": "testpassword"}
-    response = await client.post("/api/v1/auth/login", json=login_data)
-    
-    return response.json()["access_token"]
+    # Reuse the session-wide token instead of logging in for every test
+    return admin_access_token
 
 
 @pytest.fixture
-async def user_token(client: AsyncClient, db_session: AsyncSession) -> str:
+async def user_token(db_session: AsyncSession, user_access_token: str) -> str:
     """Create regular user and return auth token."""
     from app.services.auth import AuthService
     from app.schemas.user import UserCreate
@@ -109,11 +137,8 @@ async def user_token(client: AsyncClient, db_session: AsyncSession) -> str:
     auth_service = AuthService()
     user = await auth_service.create_user(db_session, user_data)
     
-    # Login and get token
-    login_data = {"username": "testuser", "password": "testpassword"}
-    response = await client.post("/api/v1/auth/login", json=login_data)
-    
-    return response.json()["access_token"]
+    # Reuse the session-wide token instead of logging in for every test
+    return user_access_token
 
 
 @pytest.fixture
@@ -0,0 +1,38 @@
+-- Add indexes backing hot read paths
+
+-- Inactive train count
+CREATE INDEX idx_trains_active ON trains(is_active);
+
+-- Bookings made in the last hour
+CREATE INDEX idx_bookings_booking_date ON bookings(booking_date);
+
+-- Upcoming schedules with low seat availability
+CREATE INDEX idx_schedules_date_seats ON train_schedules(schedule_date, available_seats);
+
+-- Schedules for a route on a travel date
+CREATE INDEX idx_schedules_route_date_status ON train_schedules(route_id, schedule_date, status);
+
+-- A user's bookings by status
+CREATE INDEX idx_bookings_user_status ON bookings(user_id, status);
+
+-- A user's bookings, newest first
+CREATE INDEX idx_bookings_user_booking_date ON bookings(user_id, booking_date);
+
+-- Pending refund queue and per-user refund lookups
+CREATE INDEX idx_refund_requests_status_user ON refund_requests(status, user_id);
+
+-- Recent active alert lookup by title
+CREATE INDEX idx_system_alerts_title_active_created ON system_alerts(title, is_active, created_at);
+
+-- Active cards and UPI ids per user
+CREATE INDEX idx_credit_cards_user_active ON credit_cards(user_id, is_active);
+CREATE INDEX idx_upi_ids_user_active ON upi_ids(user_id, is_active);
+
+-- Newest-first payment and transaction history
+CREATE INDEX idx_payments_user_created ON payments(user_id, created_at);
+CREATE INDEX idx_wallet_transactions_wallet_created ON wallet_transactions(wallet_id, created_at);
+CREATE INDEX idx_card_transactions_card_created ON card_transactions(card_id, created_at);
+CREATE INDEX idx_upi_transactions_upi_created ON upi_transactions(upi_id, created_at);
+
+-- Train search by source and destination station
+CREATE INDEX idx_routes_src_dst_active ON routes(source_station_id, destination_station_id, is_active);
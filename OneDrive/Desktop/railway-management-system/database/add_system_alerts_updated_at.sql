@@ -0,0 +1,2 @@
+-- Add updated_at column to system_alerts tables created from schema.sql
+ALTER TABLE system_alerts ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;
\ No newline at end of file
@@ -0,0 +1,4 @@
+-- Allow only one payment per booking
+ALTER TABLE payments
+DROP INDEX idx_payments_booking,
+ADD UNIQUE INDEX uq_payments_booking (booking_id);
\ No newline at end of file
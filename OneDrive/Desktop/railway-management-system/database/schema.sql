@@ -120,14 +120,19 @@ CREATE TABLE system_alerts (
     icon VARCHAR(50) DEFAULT 'info-circle',
     dismissible BOOLEAN DEFAULT TRUE,
     is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
 -- Indexes for performance
 CREATE INDEX idx_users_username ON users(username);
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_trains_number ON trains(number);
+CREATE INDEX idx_trains_active ON trains(is_active);
 CREATE INDEX idx_routes_train ON routes(train_id);
 CREATE INDEX idx_schedules_date ON train_schedules(schedule_date);
+CREATE INDEX idx_schedules_date_seats ON train_schedules(schedule_date, available_seats);
 CREATE INDEX idx_bookings_user ON bookings(user_id);
-CREATE INDEX idx_bookings_reference ON bookings(booking_reference);
\ No newline at end of file
+CREATE INDEX idx_bookings_reference ON bookings(booking_reference);
+CREATE INDEX idx_bookings_booking_date ON bookings(booking_date);
+CREATE INDEX idx_system_alerts_title_active_created ON system_alerts(title, is_active, created_at);
\ No newline at end of file